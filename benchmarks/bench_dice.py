@@ -0,0 +1,42 @@
+# bench_dice.py
+# Dice/second for the buffered DiceSource against the old randint-per-die path.
+# Run with: python benchmarks/bench_dice.py
+from __future__ import annotations
+
+import random
+import timeit
+
+from chance_sprite.dice_source import DiceSource
+
+POOL_SIZES = (6, 12, 30, 99)
+REPEATS = 5
+
+
+def randint_pool(rng: random.Random, dice: int) -> tuple[int, ...]:
+    return tuple(rng.randint(1, 6) for _ in range(dice))
+
+
+def dice_per_second(fn, dice: int, number: int) -> float:
+    best = min(timeit.repeat(fn, number=number, repeat=REPEATS))
+    return dice * number / best
+
+
+def main() -> None:
+    rng = random.Random()
+    seeded = DiceSource(random.Random())
+    urandom = DiceSource()
+
+    print(f"{'dice':>5} {'randint':>14} {'DiceSource(rng)':>16} {'DiceSource()':>14}")
+    for dice in POOL_SIZES:
+        number = max(1000, 200_000 // dice)
+        baseline = dice_per_second(lambda: randint_pool(rng, dice), dice, number)
+        seeded_rate = dice_per_second(lambda: seeded.roll(dice), dice, number)
+        urandom_rate = dice_per_second(lambda: urandom.roll(dice), dice, number)
+        print(
+            f"{dice:>5} {baseline:>12,.0f}/s {seeded_rate:>14,.0f}/s {urandom_rate:>12,.0f}/s"
+            f"  ({seeded_rate / baseline:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# bench_probability.py
+# Cold and warm query times for the exact hits/glitch tables, and how far a
+# 10k-roll simulation lands from them.
+# Run with: python benchmarks/bench_probability.py
+from __future__ import annotations
+
+import timeit
+
+from chance_sprite.probability.hits import hits_odds, hits_odds_many, joint_table
+from chance_sprite.roller import roll_hits
+from chance_sprite.sprite_utils import Glitch
+
+SIMULATED_ROLLS = 10_000
+
+
+def main() -> None:
+    joint_table.cache_clear()
+    hits_odds.cache_clear()
+    cold = timeit.timeit(lambda: hits_odds(99), number=1)
+    print(f"cold 99-die table: {cold * 1000:.1f} ms")
+
+    queries = [
+        (dice, limit, gremlins)
+        for dice in range(1, 100)
+        for limit in (0, 6)
+        for gremlins in (0, 2)
+    ]
+    cold_batch = timeit.timeit(lambda: hits_odds_many(queries), number=1)
+    warm_batch = timeit.repeat(lambda: hits_odds_many(queries), number=10, repeat=5)
+    per_query = min(warm_batch) / 10 / len(queries)
+    print(
+        f"{len(queries)} queries: cold {cold_batch * 1000:.1f} ms,"
+        f" warm {per_query * 1e6:.2f} us/query"
+    )
+
+    print(f"\n{'dice':>5} {'glitch':>8} {'simulated':>10} {'E[hits]':>8} {'simulated':>10}")
+    for dice in (2, 6, 12, 20):
+        odds = hits_odds(dice)
+        rolls = [roll_hits(dice) for _ in range(SIMULATED_ROLLS)]
+        glitches = sum(r.glitch != Glitch.NONE for r in rolls) / SIMULATED_ROLLS
+        mean_hits = sum(r.hits_limited for r in rolls) / SIMULATED_ROLLS
+        print(
+            f"{dice:>5} {odds.glitch_chance:>8.4f} {glitches:>10.4f}"
+            f" {odds.expected_hits:>8.3f} {mean_hits:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
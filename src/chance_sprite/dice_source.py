@@ -0,0 +1,73 @@
+# dice_source.py
+from __future__ import annotations
+
+import os
+import random
+from typing import Callable
+
+from chance_sprite.packed_dice import PackedDice, ReplayDice, faces_from_bytes
+
+
+class DiceSource:
+    """
+    Buffered d6 generator. Pulls random bytes in chunks (from os.urandom, or from
+    a Random instance for reproducible rolls) and turns a whole chunk into faces
+    with a single translate, so a pool costs one slice instead of a randint per die.
+
+    With `replayable` set, each pool gets its own seed instead, and is stored as
+    that seed plus a draw counter (see ReplayDice).
+    """
+
+    def __init__(
+        self,
+        rng: random.Random | None = None,
+        *,
+        chunk_size: int = 4096,
+        replayable: bool = False,
+    ):
+        self._randbytes: Callable[[int], bytes] = (
+            os.urandom if rng is None else rng.randbytes
+        )
+        self.chunk_size = chunk_size
+        self.replayable = replayable
+        self._buffer = b""
+        self._pos = 0
+
+    def _refill(self, needed: int) -> None:
+        faces = self._buffer[self._pos :]
+        while len(faces) < needed:
+            chunk = self._randbytes(self.chunk_size)
+            faces += faces_from_bytes(chunk)
+        self._buffer = faces
+        self._pos = 0
+
+    def roll_bytes(self, dice: int) -> bytes:
+        """Roll a pool, one face (1-6) per byte."""
+        if dice <= 0:
+            return b""
+        if len(self._buffer) - self._pos < dice:
+            self._refill(dice)
+        start = self._pos
+        self._pos += dice
+        return self._buffer[start : self._pos]
+
+    def roll(self, dice: int) -> PackedDice:
+        if dice <= 0:
+            return PackedDice()
+        if self.replayable:
+            seed = int.from_bytes(self._randbytes(8))
+            return ReplayDice(seed, dice)
+        return PackedDice(self.roll_bytes(dice))
+
+    def extend(self, dice: PackedDice, count: int) -> PackedDice:
+        """Add `count` dice to a pool, continuing its seeded stream if it has one."""
+        if count <= 0:
+            return dice
+        if isinstance(dice, ReplayDice):
+            return dice.extended(count)
+        if not dice:
+            return self.roll(count)
+        return dice + self.roll(count)
+
+
+default_dice_source = DiceSource()
@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Any
 
 import discord
 from discord.ext import commands
 
+from chance_sprite.dice_source import default_dice_source
+from chance_sprite.emojis.dice_image import IMAGE_TOKEN_PACK
 from chance_sprite.emojis.emoji_manager import EmojiManager
 from chance_sprite.file_sprite import (
     CacheFile,
@@ -36,22 +39,33 @@ class DiscordSprite(commands.Bot):
             intents=_intents(),
         )
         self.config = ConfigFile[str, Any]("config.json")
+        # Store each dice pool as a seed and draw counter instead of its faces
+        default_dice_source.replayable = bool(self.config.get("replayable_rolls", False))
         self.database = DatabaseHandle("chance_sprite.sqlite3")
         heavy_emojis = EmojiManager("chance_sprite.emojis")
         lite_emojis = EmojiManager("chance_sprite.emojis")
+        image_emojis = EmojiManager("chance_sprite.emojis")
+        image_emojis.packs = IMAGE_TOKEN_PACK
 
         self.emoji_manager = heavy_emojis
         self.lite_emojis = lite_emojis
+        self.image_emojis = image_emojis
         self.message_store = MessageRecordStore(self.database)
         self.message_handles: dict[int, discord.InteractionMessage] = dict()
-        self.webhook_handles = CacheFile[int, WebhookHandle]("webhook_cache.json")
+        self.webhook_handles = CacheFile[int, WebhookHandle](
+            "webhook_cache.json", int, WebhookHandle
+        )
         self.base_command_name = None
         self.user_avatar_store = UserAvatarStore(self.database)
+        self.sweeper: asyncio.Task[None] | None = None
+        self.backfill: asyncio.Task[int] | None = None
         self.enable_global_sync = enable_sync
         self.base_command_name = self.config["command_name"]
 
     async def setup_hook(self) -> None:
         self.add_view(RollViewPersist())
+        self.sweeper = asyncio.create_task(self.message_store.run_sweeper())
+        self.backfill = asyncio.create_task(self.message_store.backfill_columns())
         log.info(f"Global sync: {self.enable_global_sync}")
         self.tree.clear_commands(guild=None)
 
@@ -66,6 +80,15 @@ class DiscordSprite(commands.Bot):
         if self.enable_global_sync:
             await self.tree.sync()
 
+    async def close(self) -> None:
+        await super().close()
+        for task in (self.sweeper, self.backfill):
+            if task:
+                task.cancel()
+        # Commit whatever is still waiting in the write-behind queue
+        await self.database.writes.flush()
+        self.database.close()
+
     async def on_ready(self) -> None:
         if self.user:
             print(f"Logged in as {self.user} (id={self.user.id})")
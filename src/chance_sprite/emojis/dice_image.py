@@ -0,0 +1,120 @@
+# dice_image.py
+from __future__ import annotations
+
+import asyncio
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache, lru_cache
+from importlib import resources
+from io import BytesIO
+
+from PIL import Image
+
+from chance_sprite.emojis.emoji_manager import RAW_TEXT_EMOJI_PACK, EmojiPack
+
+TILE_SIZE = 40
+TILE_GAP = 4
+DICE_PER_LINE = 20
+ROW_GAP = 12
+IMAGE_FILENAME = "dice.png"
+
+# Dice render as private-use tokens, which are then cut out of the text and
+# drawn. Each token stands for one of the face PNGs shipped with the emojis.
+_TOKEN_FACES = {
+    **{chr(0xE000 + face): f"d6r{face}" for face in range(1, 7)},
+    **{chr(0xE010 + face): f"d6l{face}" for face in range(1, 7)},
+    chr(0xE007): "d6e6",
+    chr(0xE021): "d6g1",
+    chr(0xE031): "d6l1g",
+}
+_TOKEN_RUN = re.compile("[\ue000-\ue03f]+")
+
+
+def _tokens(*faces: int, base: int = 0xE000) -> list[str]:
+    return [chr(base + face) for face in faces]
+
+
+IMAGE_TOKEN_PACK = EmojiPack(
+    d6=_tokens(1, 2, 3, 4, 5, 6),
+    d6_ex=_tokens(1, 2, 3, 4, 5, 7),
+    d6_limited=_tokens(1, 2, 3, 4, 5, 6, base=0xE010),
+    d6_glitch=_tokens(0x21, 2, 3, 4, 5, 6),
+    d6_ex_glitch=_tokens(0x21, 2, 3, 4, 5, 7),
+    d6_limited_glitch=_tokens(0x21, 2, 3, 4, 5, 6, base=0xE010),
+    reroll=RAW_TEXT_EMOJI_PACK.reroll,
+    push=RAW_TEXT_EMOJI_PACK.push,
+    btl=RAW_TEXT_EMOJI_PACK.btl,
+    close_call=RAW_TEXT_EMOJI_PACK.close_call,
+    glitch=RAW_TEXT_EMOJI_PACK.glitch,
+    critical_glitch=RAW_TEXT_EMOJI_PACK.critical_glitch,
+)
+
+
+def _token_order(token: str) -> tuple[bool, int]:
+    # Kept dice first, highest face first, then the limited ones
+    name = _TOKEN_FACES[token]
+    return name.startswith("d6l"), -int(name[3])
+
+
+@cache
+def load_atlas(resource: str = "chance_sprite.emojis") -> dict[str, Image.Image]:
+    """Every face PNG, decoded and scaled to a tile once."""
+    base = resources.files(resource)
+    atlas = {}
+    for token, name in _TOKEN_FACES.items():
+        with Image.open(BytesIO(base.joinpath(f"{name}.png").read_bytes())) as img:
+            atlas[token] = img.convert("RGBA").resize(
+                (TILE_SIZE, TILE_SIZE), Image.Resampling.LANCZOS
+            )
+    return atlas
+
+
+def extract_dice_rows(txt: str, rows: list[str]) -> str:
+    """
+    Cut each run of dice tokens out of `txt`, appending it to `rows` as a
+    sorted multiset, and leave a short reference to the image row behind.
+    """
+
+    def cut(match: re.Match[str]) -> str:
+        run = match.group()
+        rows.append("".join(sorted(run, key=_token_order)))
+        return f"🎲×{len(run)}"
+
+    return _TOKEN_RUN.sub(cut, txt)
+
+
+@lru_cache(maxsize=256)
+def render_dice_rows(rows: tuple[str, ...]) -> bytes:
+    """Composite dice rows into one PNG. Long rows wrap after DICE_PER_LINE dice."""
+    atlas = load_atlas()
+    step = TILE_SIZE + TILE_GAP
+    lines = [
+        [row[i : i + DICE_PER_LINE] for i in range(0, len(row), DICE_PER_LINE)]
+        for row in rows
+    ]
+    width = max(len(row) for row in rows) if rows else 1
+    width = min(width, DICE_PER_LINE) * step - TILE_GAP
+    height = sum(len(row_lines) for row_lines in lines) * step
+    height += ROW_GAP * max(len(rows) - 1, 0) - TILE_GAP
+    image = Image.new("RGBA", (max(width, 1), max(height, 1)))
+
+    y = 0
+    for row_lines in lines:
+        for line in row_lines:
+            for x, token in enumerate(line):
+                tile = atlas[token]
+                image.alpha_composite(tile, (x * step, y))
+            y += step
+        y += ROW_GAP
+
+    out = BytesIO()
+    image.save(out, format="PNG", optimize=True)
+    return out.getvalue()
+
+
+_render_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="dice-image")
+
+
+async def render_dice_rows_async(rows: tuple[str, ...]) -> bytes:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_render_pool, render_dice_rows, rows)
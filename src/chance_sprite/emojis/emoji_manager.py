@@ -3,12 +3,16 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
+from functools import cached_property
 from importlib import resources
 from io import BytesIO
 
 import discord
 from PIL import Image, UnidentifiedImageError
 
+from chance_sprite.emojis.render_cache import RenderCache
+from chance_sprite.sprite_utils import LIMITED_OFFSET
+
 log = logging.getLogger(__name__)
 
 KEYCAPS_0_10 = "0️⃣ 1️⃣ 2️⃣ 3️⃣ 4️⃣ 5️⃣ 6️⃣ 7️⃣ 8️⃣ 9️⃣ 🔟"
@@ -42,6 +46,40 @@ class EmojiPack:
     glitch: str
     critical_glitch: str
 
+    @cached_property
+    def compiled(self) -> CompiledPack:
+        return CompiledPack.compile(self)
+
+
+def _dice_table(kept: list[str], limited: list[str]) -> tuple[str, ...]:
+    # Indexed by face; the unused slots map back to themselves
+    table = [chr(i) for i in range(7 + LIMITED_OFFSET)]
+    table[1:7] = kept
+    table[1 + LIMITED_OFFSET :] = limited
+    return tuple(table)
+
+
+@dataclass(frozen=True)
+class CompiledPack:
+    """
+    str.translate tables from packed dice faces straight to emoji. Faces 1-6
+    are kept dice, and the same faces past LIMITED_OFFSET are limited dice.
+    """
+
+    d6: tuple[str, ...]
+    d6_glitch: tuple[str, ...]
+    d6_ex: tuple[str, ...]
+    d6_ex_glitch: tuple[str, ...]
+
+    @classmethod
+    def compile(cls, pack: EmojiPack) -> CompiledPack:
+        return cls(
+            d6=_dice_table(pack.d6, pack.d6_limited),
+            d6_glitch=_dice_table(pack.d6_glitch, pack.d6_limited_glitch),
+            d6_ex=_dice_table(pack.d6_ex, pack.d6_ex),
+            d6_ex_glitch=_dice_table(pack.d6_ex_glitch, pack.d6_ex_glitch),
+        )
+
 
 RAW_TEXT_EMOJI_PACK: EmojiPack = EmojiPack(
     d6=["①", "②", "③", "④", "❺", "❻"],
@@ -64,6 +102,7 @@ class EmojiManager:
         self.resource = resource
         self.by_name: dict[str, discord.Emoji] = {}
         self.packs: EmojiPack = RAW_TEXT_EMOJI_PACK
+        self.render_cache = RenderCache()
 
     def iter_emoji_assets(self):
         base = resources.files(self.resource)
@@ -149,5 +188,7 @@ class EmojiManager:
             glitch="glitch",
             critical_glitch="critglitch",
         )
+        packs.compiled  # build the translate tables once, up front
         self.packs = packs
+        self.render_cache.clear()
         return packs
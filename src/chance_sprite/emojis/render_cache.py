@@ -0,0 +1,43 @@
+# render_cache.py
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+
+class RenderCache:
+    """
+    Bounded LRU of rendered dice lines. Keys describe everything a line depends
+    on except the emoji pack, so each EmojiManager keeps its own and clears it
+    when its packs change.
+    """
+
+    def __init__(self, maxsize: int = 2048):
+        self.maxsize = maxsize
+        self._lines: OrderedDict[Hashable, str] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, render: Callable[[], str]) -> str:
+        line = self._lines.get(key)
+        if line is not None:
+            self._lines.move_to_end(key)
+            self.hits += 1
+            return line
+        self.misses += 1
+        line = render()
+        self._lines[key] = line
+        if len(self._lines) > self.maxsize:
+            self._lines.popitem(last=False)
+        return line
+
+    def clear(self) -> None:
+        self._lines.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        return len(self._lines)
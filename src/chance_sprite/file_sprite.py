@@ -3,12 +3,21 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import os
 import sqlite3
-from collections.abc import Iterator, Mapping, MutableMapping
-from dataclasses import dataclass
+from collections.abc import (
+    Callable,
+    Hashable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    Sequence,
+)
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from typing import Any, Optional
 
@@ -20,6 +29,8 @@ from chance_sprite.sprite_utils import epoch_seconds
 from . import APP_NAME
 from .message_cache import message_codec
 from .message_cache.message_record import MessageRecord
+from .message_cache.record_cache import RecordCache
+from .message_cache.roll_record_base import RollRecordBase
 
 log = logging.getLogger(__name__)
 
@@ -94,9 +105,7 @@ class WriteableFile[K, V](ReadableFile, MutableMapping[K, V]):
         self.save()
 
 
-@message_codec.register("_CachedEntry")
-@dataclass
-class _CachedEntry[V]:
+class _CachedEntry[V](msgspec.Struct, tag_field="type", tag=True):
     value: V
     expires_at: int  # epoch seconds
 
@@ -104,9 +113,10 @@ class _CachedEntry[V]:
 class CacheFile[K, V](ReadableFile, MutableMapping[K, V]):
     _cache_dir = Path(PlatformDirs(appname=APP_NAME, appauthor=False).user_cache_dir)
 
-    def __init__(self, filename: str):
+    def __init__(self, filename: str, key_type: Any = Any, value_type: Any = Any):
         self._dir = self._cache_dir
         self.path = self._cache_dir / filename
+        self._entry_type = dict[key_type, _CachedEntry[value_type]]
         self._data: dict[K, _CachedEntry[V]] = self._load()
         self._purge_expired()
 
@@ -121,13 +131,16 @@ class CacheFile[K, V](ReadableFile, MutableMapping[K, V]):
 
     def _load(self) -> dict[K, _CachedEntry[V]]:
         data = super()._load()
-        restored = message_codec.decode_with_hint(data, dict[K, _CachedEntry[V]])
-        return restored
+        try:
+            return message_codec.from_builtins(data, self._entry_type, str_keys=True)
+        except msgspec.ValidationError:
+            log.exception("Invalid entries in %s; using empty data", self.path)
+            return {}
 
     def save(self) -> None:
         self._dir.mkdir(parents=True, exist_ok=True)
         tmp = self.path.with_suffix(self.path.suffix + ".tmp")
-        encoded_data = message_codec.dict_from_dataclass(self._data)
+        encoded_data = message_codec.to_builtins(self._data)
         with tmp.open("w", encoding="utf-8") as f:
             json.dump(encoded_data, f, indent=2, ensure_ascii=False)
             f.flush()
@@ -179,18 +192,47 @@ class StateFile[K, V](WriteableFile[K, V]):
 
 
 class DatabaseHandle:
+    """
+    sqlite database owned by a single writer thread. Every statement runs on
+    that thread, so a stalled fsync holds up the thread instead of the event
+    loop. The *_async methods await the result; the plain ones block for it,
+    which is fine at startup and in scripts.
+    """
+
     _state_dir = Path(PlatformDirs(appname=APP_NAME, appauthor=False).user_state_dir)
 
     def __init__(self, filename: str):
         self.path = self._state_dir / filename
         self.path.parent.mkdir(parents=True, exist_ok=True)
 
-        self.conn = sqlite3.connect(self.path, isolation_level=None)
-        self.conn.execute("PRAGMA journal_mode=WAL;")
-        self.conn.execute("PRAGMA synchronous=FULL;")
+        self._writer = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="sqlite-writer"
+        )
+        self.conn: sqlite3.Connection = self.call(self._connect)
+        self.writes = WriteBehind(self)
 
-    def init_table_intkey(self, table_name: str):
-        self.conn.execute(
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=FULL;")
+        return conn
+
+    def call[T](self, fn: Callable[..., T], *args: Any) -> T:
+        """Run `fn` on the writer thread and block until it's done."""
+        return self._writer.submit(fn, *args).result()
+
+    async def call_async[T](self, fn: Callable[..., T], *args: Any) -> T:
+        return await asyncio.wrap_future(self._writer.submit(fn, *args))
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> list[Any]:
+        return self.call(self._execute, sql, params)
+
+    def _execute(self, sql: str, params: Sequence[Any]) -> list[Any]:
+        return self.conn.execute(sql, params).fetchall()
+
+    def init_table_intkey(self, table_name: str, columns: Mapping[str, str] = {}):
+        """Create the table, adding any of `columns` (name -> declaration) it lacks."""
+        self.execute(
             f"""
             CREATE TABLE IF NOT EXISTS {table_name} (
               record_id INTEGER PRIMARY KEY,
@@ -198,11 +240,22 @@ class DatabaseHandle:
             )
         """,
         )
+        info = self.execute(f"PRAGMA table_info({table_name})")
+        existing = {row[1] for row in info}
+        for name, declaration in columns.items():
+            if name not in existing:
+                self.execute(
+                    f"ALTER TABLE {table_name} ADD COLUMN {name} {declaration}"
+                )
 
     def close(self) -> None:
-        self.conn.close()
+        self.writes.flush_now()
+        self.call(self.conn.close)
+        self._writer.shutdown()
+
+    # Statements; these only ever run on the writer thread
 
-    def get(self, table: str, record_id: int) -> Optional[dict]:
+    def _get(self, table: str, record_id: int) -> Optional[bytes]:
         row = self.conn.execute(
             f"SELECT payload FROM {table} WHERE record_id=?",
             (record_id,),
@@ -210,59 +263,385 @@ class DatabaseHandle:
         if row is None:
             return None
 
-        return msgspec.msgpack.decode(row[0])
-
-    def put(self, table: str, record_id: int, data_dict: dict) -> None:
-        payload_bytes: bytes = msgspec.msgpack.encode(data_dict)
-
+        return row[0]
+
+    def _put(
+        self,
+        table: str,
+        record_id: int,
+        payload_bytes: bytes,
+        columns: Mapping[str, Any] = {},
+    ) -> None:
+        names = ", ".join(["payload", *columns])
+        updates = ", ".join(f"{name}=excluded.{name}" for name in ["payload", *columns])
         self.conn.execute(
-            f"INSERT INTO {table}(record_id, payload) VALUES(?, ?) "
-            "ON CONFLICT(record_id) DO UPDATE SET payload=excluded.payload",
-            (record_id, payload_bytes),
+            f"INSERT INTO {table}(record_id, {names}) "
+            f"VALUES(?, ?{', ?' * len(columns)}) "
+            f"ON CONFLICT(record_id) DO UPDATE SET {updates}",
+            (record_id, payload_bytes, *columns.values()),
         )
 
-    def seed(self, table: str, record_id: int, data_dict: dict):
-        payload_bytes: bytes = msgspec.msgpack.encode(data_dict)
+    def _seed(
+        self,
+        table: str,
+        record_id: int,
+        payload_bytes: bytes,
+        columns: Mapping[str, Any] = {},
+    ):
+        names = ", ".join(["payload", *columns])
         self.conn.execute(
-            f"INSERT INTO {table}(record_id, payload) VALUES(?, ?) "
+            f"INSERT INTO {table}(record_id, {names}) "
+            f"VALUES(?, ?{', ?' * len(columns)}) "
             "ON CONFLICT(record_id) DO NOTHING",
-            (record_id, payload_bytes),
+            (record_id, payload_bytes, *columns.values()),
         )
 
-    def delete(self, table: str, record_id: int) -> None:
+    def _delete(self, table: str, record_id: int) -> None:
         self.conn.execute(f"DELETE FROM {table} WHERE record_id=?", (record_id,))
 
-    def count(self, table: str) -> int:
-        (n,) = self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()
+    def get(self, table: str, record_id: int) -> Optional[bytes]:
+        return self.call(self._get, table, record_id)
+
+    async def get_async(self, table: str, record_id: int) -> Optional[bytes]:
+        return await self.call_async(self._get, table, record_id)
+
+    def put(
+        self,
+        table: str,
+        record_id: int,
+        payload_bytes: bytes,
+        columns: Mapping[str, Any] = {},
+    ) -> None:
+        self.call(self._put, table, record_id, payload_bytes, columns)
+
+    async def put_async(
+        self,
+        table: str,
+        record_id: int,
+        payload_bytes: bytes,
+        columns: Mapping[str, Any] = {},
+    ):
+        await self.call_async(self._put, table, record_id, payload_bytes, columns)
+
+    def seed(
+        self,
+        table: str,
+        record_id: int,
+        payload_bytes: bytes,
+        columns: Mapping[str, Any] = {},
+    ):
+        self.call(self._seed, table, record_id, payload_bytes, columns)
+
+    async def seed_async(
+        self,
+        table: str,
+        record_id: int,
+        payload_bytes: bytes,
+        columns: Mapping[str, Any] = {},
+    ):
+        await self.call_async(self._seed, table, record_id, payload_bytes, columns)
+
+    def delete(self, table: str, record_id: int) -> None:
+        self.call(self._delete, table, record_id)
+
+    async def delete_async(self, table: str, record_id: int) -> None:
+        await self.call_async(self._delete, table, record_id)
+
+    def _count(self, table: str) -> int:
+        ((n,),) = self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchall()
         return int(n)
 
+    def _ids(self, table: str) -> list[int]:
+        rows = self.conn.execute(f"SELECT record_id FROM {table} ORDER BY record_id")
+        return [int(rid) for (rid,) in rows]
+
+    def count(self, table: str) -> int:
+        return self.call(self._count, table)
+
+    async def count_async(self, table: str) -> int:
+        return await self.call_async(self._count, table)
+
     def iter_ids(self, table: str) -> Iterator[int]:
-        cur = self.conn.execute(f"SELECT record_id FROM {table} ORDER BY record_id")
-        for (rid,) in cur:
-            yield int(rid)
+        yield from self.call(self._ids, table)
+
+    async def ids_async(self, table: str) -> list[int]:
+        return await self.call_async(self._ids, table)
+
+
+def _log_failure(future: asyncio.Future[Any]) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        log.error("Queued database write failed", exc_info=future.exception())
+
+
+# Pending value for a key whose row is about to be deleted
+DELETED: Any = object()
+
+# A queued write: the row's new value, the write itself, and what to call if
+# the write had to be dropped
+type _Entry = tuple[Any, Callable[[], None], Callable[[], None] | None]
+
+
+class WriteBehind:
+    """
+    Write-behind queue in front of a DatabaseHandle. Writes wait here keyed by
+    row, so repeated writes to one row collapse into the last one, and are
+    committed together in a single transaction every `interval` seconds or
+    once `max_batch` rows are waiting. Reads check pending() first, so callers
+    always see their own writes. If a batch fails its rows are retried one at
+    a time, so a bad row only takes itself down.
+    """
+
+    def __init__(
+        self,
+        database: DatabaseHandle,
+        *,
+        interval: float = 0.05,
+        max_batch: int = 200,
+    ):
+        self.database = database
+        self.interval = interval
+        self.max_batch = max_batch
+        self._pending: dict[Hashable, _Entry] = {}
+        # Batches handed to the writer thread but not committed yet
+        self._in_flight: list[dict[Hashable, _Entry]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    def put(
+        self,
+        key: Hashable,
+        value: Any,
+        write: Callable[[], None],
+        on_fail: Callable[[], None] | None = None,
+    ) -> None:
+        """
+        Queue `write` (run later on the writer thread) as the new state of
+        `key`. `on_fail` is called back if the write is dropped and nothing
+        newer has been queued for `key` since.
+        """
+        self._pending[key] = (value, write, on_fail)
+        self._schedule()
+
+    def pending(self, key: Hashable, default: Any = None) -> Any:
+        """The value waiting to be written for `key`, DELETED, or `default`."""
+        entry = self._pending.get(key)
+        if entry is None:
+            for batch in reversed(self._in_flight):
+                if key in batch:
+                    entry = batch[key]
+                    break
+            else:
+                return default
+        return entry[0]
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _schedule(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Nothing to flush later from, e.g. in scripts
+            self.flush_now()
+            return
+        if len(self._pending) >= self.max_batch:
+            self._flush_soon()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.interval, self._flush_soon)
+
+    def _flush_soon(self) -> None:
+        task = asyncio.get_running_loop().create_task(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        task.add_done_callback(_log_failure)
+
+    def _take_batch(self) -> dict[Hashable, _Entry]:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            self._in_flight.append(batch)
+        return batch
+
+    async def flush(self) -> None:
+        batch = self._take_batch()
+        if not batch:
+            return
+        try:
+            failed = await self.database.call_async(self._commit, batch)
+        except BaseException:
+            self._release(batch)
+            raise
+        self._settle(batch, failed)
+
+    def flush_now(self) -> None:
+        """Commit everything pending, blocking until it's written."""
+        batch = self._take_batch()
+        if not batch:
+            return
+        try:
+            failed = self.database.call(self._commit, batch)
+        except BaseException:
+            self._release(batch)
+            raise
+        self._settle(batch, failed)
+
+    def _release(self, batch: dict[Hashable, _Entry]) -> list[dict[Hashable, _Entry]]:
+        """Drop `batch` from the in-flight list, returning those taken after it."""
+        # By identity: two batches can hold equal entries
+        index = next(i for i, other in enumerate(self._in_flight) if other is batch)
+        del self._in_flight[index]
+        return self._in_flight[index:]
+
+    def _settle(self, batch: dict[Hashable, _Entry], failed: list[Hashable]) -> None:
+        newer = self._release(batch)
+        for key in failed:
+            # A newer write for the row replaces the one that was dropped
+            if key in self._pending or any(key in later for later in newer):
+                continue
+            on_fail = batch[key][2]
+            if on_fail is not None:
+                on_fail()
+
+    def _commit(self, batch: dict[Hashable, _Entry]) -> list[Hashable]:
+        """Write `batch`, returning the keys whose writes had to be dropped."""
+        try:
+            self._transaction([write for _, write, _ in batch.values()])
+            return []
+        except Exception:
+            log.warning(
+                "Batch of %d writes failed, retrying one at a time",
+                len(batch),
+                exc_info=True,
+            )
+        failed: list[Hashable] = []
+        for key, (_, write, _) in batch.items():
+            try:
+                self._transaction([write])
+            except Exception:
+                log.exception("Dropped queued write for %r", key)
+                failed.append(key)
+        return failed
+
+    def _transaction(self, writes: list[Callable[[], None]]) -> None:
+        conn = self.database.conn
+        conn.execute("BEGIN")
+        try:
+            for write in writes:
+                write()
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
 
 
 class DatabaseTableInt[V](MutableMapping[int, V]):
-    def __init__(self, database: DatabaseHandle, table_name: str):
+    # Columns kept next to the payload so they can be queried, as
+    # name -> SQL declaration; column_values() fills them in on every put
+    columns: Mapping[str, str] = {}
+    # Column values the backfill leaves on rows whose payload won't decode,
+    # so later runs skip them instead of decoding them again
+    undecodable: Mapping[str, Any] = {}
+
+    def __init__(
+        self,
+        database: DatabaseHandle,
+        table_name: str,
+        record_type: Any,
+        cache: RecordCache[V] | None = None,
+    ):
         super().__init__()
-        database.init_table_intkey(table_name)
+        database.init_table_intkey(table_name, self.columns)
         self.database = database
         self.table = table_name
+        self.record_type = record_type
+        self.cache = cache
+
+    def _decode(self, record_id: int, payload: Optional[bytes]) -> Optional[V]:
+        if payload is None:
+            return None
+        try:
+            return message_codec.decode(payload, self.record_type)
+        except msgspec.DecodeError:
+            log.exception("Undecodable record %d in %s", record_id, self.table)
+            return None
+
+    def _lookup(self, record_id: int) -> Any:
+        """The record if it's known without going to disk, DELETED, or None."""
+        if self.cache is not None:
+            value = self.cache.get(record_id)
+            if value is not None:
+                return value
+        return self.database.writes.pending((self.table, record_id))
+
+    def _loaded(self, record_id: int, payload: Optional[bytes]) -> Optional[V]:
+        # A write may have landed while the row was being read; it wins
+        value = self.database.writes.pending((self.table, record_id))
+        if value is None and self.cache is not None:
+            value = self.cache.peek(record_id)
+        if value is not None:
+            return None if value is DELETED else value
+        obj = self._decode(record_id, payload)
+        if obj is not None and payload is not None and self.cache is not None:
+            self.cache.put(record_id, obj, len(payload))
+        return obj
 
     def get_optional(self, record_id: int) -> Optional[V]:
-        encoded = self.database.get(self.table, record_id)
-        return message_codec.dataclass_from_dict(encoded)
+        value = self._lookup(record_id)
+        if value is not None:
+            return None if value is DELETED else value
+        return self._loaded(record_id, self.database.get(self.table, record_id))
+
+    async def get_async(self, record_id: int) -> Optional[V]:
+        value = self._lookup(record_id)
+        if value is not None:
+            return None if value is DELETED else value
+        payload = await self.database.get_async(self.table, record_id)
+        return self._loaded(record_id, payload)
+
+    def column_values(self, obj: V) -> Mapping[str, Any]:
+        return {}
 
     def set(self, record_id: int, obj: V) -> None:
-        encoded = message_codec.dict_from_dataclass(obj)
-        self.database.put(self.table, record_id, encoded)
+        payload = message_codec.encode(obj)
+        if self.cache is not None:
+            self.cache.put(record_id, obj, len(payload))
+        write = partial(
+            self.database._put, self.table, record_id, payload, self.column_values(obj)
+        )
+        # If the write is dropped, the cache mustn't keep serving it
+        on_fail = None
+        if self.cache is not None:
+            on_fail = partial(self.cache.discard, record_id)
+        self.database.writes.put((self.table, record_id), obj, write, on_fail)
+
+    async def set_async(self, record_id: int, obj: V) -> None:
+        self.set(record_id, obj)
+
+    # seed(), len() and iteration flush the queue and block on the writer
+    # thread, so they're for startup and scripts; the bot uses the *_async ones
 
     def seed(self, record_id: int, obj: V):
-        encoded = message_codec.dict_from_dataclass(obj)
-        self.database.seed(self.table, record_id, encoded)
+        self.database.writes.flush_now()
+        payload = message_codec.encode(obj)
+        self.database.seed(self.table, record_id, payload, self.column_values(obj))
+
+    async def seed_async(self, record_id: int, obj: V):
+        await self.database.writes.flush()
+        payload = message_codec.encode(obj)
+        await self.database.seed_async(
+            self.table, record_id, payload, self.column_values(obj)
+        )
 
     def delete(self, record_id: int) -> None:
-        self.database.delete(self.table, record_id)
+        if self.cache is not None:
+            self.cache.discard(record_id)
+        write = partial(self.database._delete, self.table, record_id)
+        self.database.writes.put((self.table, record_id), DELETED, write)
+
+    async def delete_async(self, record_id: int) -> None:
+        self.delete(record_id)
 
     def __setitem__(self, key, value, /):
         self.set(key, value)
@@ -276,27 +655,201 @@ class DatabaseTableInt[V](MutableMapping[int, V]):
             raise KeyError()
         return value
 
+    def _backfill_chunk(self, after_id: int, limit: int) -> tuple[int | None, int]:
+        conn = self.database.conn
+        missing = " OR ".join(f"{name} IS NULL" for name in self.columns)
+        unmarked = "".join(f" AND {name} IS NOT ?" for name in self.undecodable)
+        rows = conn.execute(
+            f"SELECT record_id, payload FROM {self.table} "
+            f"WHERE record_id > ? AND ({missing}){unmarked} "
+            "ORDER BY record_id LIMIT ?",
+            (after_id, *self.undecodable.values(), limit),
+        ).fetchall()
+        if not rows:
+            return None, 0
+        updates: list[tuple[Any, ...]] = []
+        marks: list[tuple[Any, ...]] = []
+        for record_id, payload in rows:
+            obj = self._decode(record_id, payload)
+            if obj is not None:
+                updates.append((*self.column_values(obj).values(), record_id))
+            elif self.undecodable:
+                marks.append((*self.undecodable.values(), record_id))
+        if updates or marks:
+            assignments = ", ".join(f"{name}=?" for name in self.columns)
+            marking = ", ".join(f"{name}=?" for name in self.undecodable)
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(
+                    f"UPDATE {self.table} SET {assignments} WHERE record_id=?",
+                    updates,
+                )
+                if marks:
+                    conn.executemany(
+                        f"UPDATE {self.table} SET {marking} WHERE record_id=?",
+                        marks,
+                    )
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        return rows[-1][0], len(updates)
+
+    async def backfill_columns(self, *, chunk_size: int = 500, pause: float = 0.05):
+        """
+        Fill in the columns of rows written before they existed, walking the
+        rows that still need it `chunk_size` at a time and sleeping `pause`
+        between chunks so it can run alongside the bot. Returns how many rows
+        were filled.
+        """
+        if not self.columns:
+            return 0
+        filled = 0
+        after_id: int | None = -1
+        while after_id is not None:
+            after_id, updated = await self.database.call_async(
+                self._backfill_chunk, after_id, chunk_size
+            )
+            filled += updated
+            await asyncio.sleep(pause)
+        return filled
+
     def __len__(self):
+        self.database.writes.flush_now()
         return self.database.count(self.table)
 
     def __iter__(self):
+        self.database.writes.flush_now()
         return self.database.iter_ids(self.table)
 
+    async def count_async(self) -> int:
+        await self.database.writes.flush()
+        return await self.database.count_async(self.table)
+
+    async def ids_async(self) -> list[int]:
+        await self.database.writes.flush()
+        return await self.database.ids_async(self.table)
+
 
 class MessageRecordStore(DatabaseTableInt[MessageRecord]):
+    columns = {
+        "guild_id": "INTEGER",  # 0 for DMs
+        "channel_id": "INTEGER",
+        "owner_id": "INTEGER",
+        "created_at": "INTEGER",
+        "expires_at": "INTEGER",
+        "roll_type": "TEXT",
+    }
+    undecodable = {"roll_type": "!undecodable"}
+    # Each ends in created_at so history and stats queries read in time order
+    # straight off the index; record_id comes along as the rowid
+    indexes = {
+        "expires_at": ("expires_at",),
+        "channel": ("guild_id", "channel_id", "created_at"),
+        "owner": ("owner_id", "created_at"),
+        "roll_type": ("roll_type", "created_at"),
+    }
+
     def __init__(self, database: DatabaseHandle):
-        super().__init__(database, "message_records")
         message_codec.build_registry_default()
+        roll_records = message_codec.union(RollRecordBase)
+        super().__init__(
+            database,
+            "message_records",
+            MessageRecord[roll_records],
+            cache=RecordCache(),
+        )
+        for name, indexed in self.indexes.items():
+            database.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_{name} "
+                f"ON {self.table}({', '.join(indexed)})"
+            )
+        # Totals across every sweep since startup
+        self.rows_swept = 0
+        self.bytes_reclaimed = 0
+
+    def column_values(self, obj: MessageRecord) -> Mapping[str, Any]:
+        return {
+            "guild_id": obj.guild_id or 0,
+            "channel_id": obj.channel_id,
+            "owner_id": obj.owner_id,
+            "created_at": obj.created_at,
+            "expires_at": obj.expires_at,
+            "roll_type": obj.roll_result.__struct_config__.tag,
+        }
 
     def put(self, msg: MessageRecord) -> None:
         self.set(msg.message_id, msg)
 
+    async def put_async(self, msg: MessageRecord) -> None:
+        await self.set_async(msg.message_id, msg)
+
+    # Expired records may not have been swept yet; they read as missing
+    def get_optional(self, record_id: int) -> Optional[MessageRecord]:
+        return _unexpired(super().get_optional(record_id))
+
+    async def get_async(self, record_id: int) -> Optional[MessageRecord]:
+        return _unexpired(await super().get_async(record_id))
+
+    def _delete_expired(self, now: int, limit: int) -> tuple[int, int]:
+        conn = self.database.conn
+        (page_size,) = conn.execute("PRAGMA page_size").fetchone()
+        (free_before,) = conn.execute("PRAGMA freelist_count").fetchone()
+        deleted = conn.execute(
+            f"DELETE FROM {self.table} WHERE record_id IN "
+            f"(SELECT record_id FROM {self.table} WHERE expires_at <= ? LIMIT ?)",
+            (now, limit),
+        ).rowcount
+        (free_after,) = conn.execute("PRAGMA freelist_count").fetchone()
+        return deleted, max(free_after - free_before, 0) * page_size
+
+    async def sweep_expired(self, *, batch_size: int = 500, pause: float = 0.05):
+        """
+        Delete expired records `batch_size` rows at a time, each batch its own
+        transaction, sleeping `pause` between batches so other writes get in.
+        Returns how many rows went.
+        """
+        now = epoch_seconds()
+        swept = 0
+        while True:
+            deleted, freed = await self.database.call_async(
+                self._delete_expired, now, batch_size
+            )
+            swept += deleted
+            self.rows_swept += deleted
+            self.bytes_reclaimed += freed
+            if deleted < batch_size:
+                return swept
+            await asyncio.sleep(pause)
+
+    async def run_sweeper(self, interval: float = 3600) -> None:
+        while True:
+            try:
+                swept = await self.sweep_expired()
+            except Exception:
+                log.exception("Sweeping expired records failed")
+            else:
+                if swept:
+                    log.info(
+                        "Swept %d expired records (%d total, %d bytes reclaimed)",
+                        swept,
+                        self.rows_swept,
+                        self.bytes_reclaimed,
+                    )
+            await asyncio.sleep(interval)
+
+
+def _unexpired(msg: Optional[MessageRecord]) -> Optional[MessageRecord]:
+    if msg is None or msg.expires_at <= epoch_seconds():
+        return None
+    return msg
+
 
 class UserAvatarStore:
     _table = "identity_cache"
 
     def __init__(self, database: DatabaseHandle) -> None:
-        database.conn.execute(
+        database.execute(
             f"""
             CREATE TABLE IF NOT EXISTS {self._table} (
                 user_id     INTEGER NOT NULL,
@@ -310,19 +863,39 @@ class UserAvatarStore:
         )
         self.database = database
 
-    def get_avatar(self, user_id: int, guild_id: int = 0) -> tuple[str, str]:
-        row = self.database.conn.execute(
-            f"SELECT name, avatar_url FROM {self._table} WHERE user_id = ? AND guild_id = ?",
-            (user_id, guild_id),
-        ).fetchone()
-        if row is None and guild_id != 0:
-            row = self.database.conn.execute(
-                f"SELECT name, avatar_url FROM {self._table} WHERE user_id = ? AND guild_id = 0",
-                (user_id,),
-            ).fetchone()
-        return row
+    def _select(self, user_id: int, guild_id: int) -> tuple[Any, Any]:
+        # The guild's row and the global one to fall back on
+        query = f"SELECT name, avatar_url FROM {self._table} WHERE user_id = ? AND guild_id = ?"
+        guild_row = self.database.conn.execute(query, (user_id, guild_id)).fetchone()
+        if guild_id == 0:
+            return guild_row, None
+        return guild_row, self.database.conn.execute(query, (user_id, 0)).fetchone()
+
+    def _resolve(
+        self, user_id: int, guild_id: int, rows: tuple[Any, Any]
+    ) -> tuple[str, str] | None:
+        # A stored guild row beats a queued global one; the global row is
+        # only the fallback when the guild has nothing, stored or queued
+        guild_row, global_row = rows
+        if guild_row is not None or guild_id == 0:
+            return guild_row
+        return self.database.writes.pending((self._table, user_id, 0)) or global_row
 
-    def update_avatar(self, user_id: int, guild_id: int, name: str, avatar_url: str):
+    def get_avatar(self, user_id: int, guild_id: int = 0) -> tuple[str, str]:
+        pending = self.database.writes.pending((self._table, user_id, guild_id))
+        if pending:
+            return pending
+        rows = self.database.call(self._select, user_id, guild_id)
+        return self._resolve(user_id, guild_id, rows)
+
+    async def get_avatar_async(self, user_id: int, guild_id: int = 0):
+        pending = self.database.writes.pending((self._table, user_id, guild_id))
+        if pending:
+            return pending
+        rows = await self.database.call_async(self._select, user_id, guild_id)
+        return self._resolve(user_id, guild_id, rows)
+
+    def _upsert(self, user_id: int, guild_id: int, name: str, avatar_url: str):
         self.database.conn.execute(
             """
         INSERT INTO identity_cache (user_id, guild_id, name, avatar_url, updated_at)
@@ -340,3 +913,10 @@ class UserAvatarStore:
                 epoch_seconds(),
             ),
         )
+
+    def update_avatar(self, user_id: int, guild_id: int, name: str, avatar_url: str):
+        self.database.writes.put(
+            (self._table, user_id, guild_id),
+            (name, avatar_url),
+            partial(self._upsert, user_id, guild_id, name, avatar_url),
+        )
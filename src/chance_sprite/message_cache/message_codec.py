@@ -1,17 +1,44 @@
 from __future__ import annotations
 
 import importlib
+import inspect
+import logging
 import pkgutil
-import sys
-from dataclasses import fields, is_dataclass
 from types import ModuleType
-from typing import Any, get_args, get_origin, get_type_hints
+from typing import Any, Union
+
+import msgspec
+
+from chance_sprite.packed_dice import PackedDice
+
+log = logging.getLogger(__name__)
+
+
+def enc_hook(obj: Any) -> Any:
+    # Dice are stored as a single packed blob
+    if isinstance(obj, PackedDice):
+        return obj.encode()
+    raise NotImplementedError(f"Can't encode {type(obj).__name__}")
+
+
+def dec_hook(hint: type, obj: Any) -> Any:
+    if hint is PackedDice:
+        return PackedDice.decode(obj)
+    raise NotImplementedError(f"Can't decode {hint.__name__}")
 
 
 class MessageCodec:
+    """
+    msgpack codec for the tagged record structs. Each struct carries its class
+    name under "type"; tags that were renamed are kept as aliases so old
+    payloads still decode.
+    """
+
     def __init__(self):
-        self.registry = {}
-        self._hint_cache: dict[type, dict[str, Any]] = {}
+        self.registry: dict[str, type[msgspec.Struct]] = {}
+        self.aliases: dict[str, str] = {}
+        self.encoder = msgspec.msgpack.Encoder(enc_hook=enc_hook)
+        self._decoders: dict[Any, msgspec.msgpack.Decoder] = {}
 
     def build_registry_default(self):
         from .. import emojis, message_cache, result_types, roll_types, rollui
@@ -30,121 +57,56 @@ class MessageCodec:
                 mod = importlib.import_module(m.name)
 
                 for obj in vars(mod).values():
-                    if isinstance(obj, type) and is_dataclass(obj):
-                        tag = getattr(obj, "__tag__", obj.__name__)  # allow override
-                        self.registry[tag] = obj
-
-    def register(self, tag: str):
-        def decorator(cls: type):
-            self.registry[tag] = cls
-            setattr(cls, "__tag__", tag)
-            return cls
-
-        return decorator
+                    if isinstance(obj, type) and issubclass(obj, msgspec.Struct):
+                        tag = obj.__struct_config__.tag
+                        if isinstance(tag, str):
+                            self.registry[tag] = obj
+        self._decoders.clear()
 
     def alias(self, tag: str):
-        def decorator(cls: type):
-            self.registry[tag] = cls
+        def decorator(cls: type[msgspec.Struct]):
+            self.aliases[tag] = cls.__struct_config__.tag
             return cls
 
         return decorator
 
-    def decode_with_hint(self, value, hint):
-        # If it's a tagged dict, dispatch regardless of hint
-        if isinstance(value, dict) and "type" in value:
-            return self.dataclass_from_dict(value)
-
-        origin = get_origin(hint)
-
-        if origin is tuple:
-            if isinstance(value, (list, tuple)):
-                args = get_args(hint)
-                if len(args) == 2 and args[1] is ...:
-                    item_t = args[0]
-                    return tuple(self.decode_with_hint(x, item_t) for x in value)
-                if args:
-                    out = []
-                    for i, x in enumerate(value):
-                        t = args[i] if i < len(args) else Any
-                        out.append(self.decode_with_hint(x, t))
-                    return tuple(out)
-                return tuple(value)
-            return value
-
-        # Recurse containers
-        if isinstance(value, list):
-            # try to use list[T] hint if present
-            if origin is list:
-                (item_t,) = get_args(hint) or (Any,)
-                return [self.decode_with_hint(x, item_t) for x in value]
-            return [self.decode_with_hint(x, Any) for x in value]
-
-        if isinstance(value, dict):
-            # If we have dict[K, V] type info, use it
-            if origin is dict:
-                key_t, val_t = get_args(hint) or (Any, Any)
-
-                def coerce_key(k: Any) -> Any:
-                    if key_t is int and isinstance(k, str):
-                        # only convert clean integer strings; otherwise keep as-is
-                        # (prevents blowing up on keys like "123abc")
-                        try:
-                            return int(k)
-                        except ValueError:
-                            return k
-                    return k
-
-                return {
-                    coerce_key(k): self.decode_with_hint(val, val_t)
-                    for k, val in value.items()
-                }
-
-            # No hint: do NOT coerce keys; just recurse values
-            return {k: self.decode_with_hint(val, Any) for k, val in value.items()}
-
-        return value
-
-    def dataclass_from_dict(self, obj: Any) -> Any:
-        # Don't guess at objects without type parameters
-        if not (isinstance(obj, dict) and "type" in obj):
-            return obj
-
-        tag = obj.get("type")
-        if not isinstance(tag, str):
-            raise ValueError("type must be a string")
-
-        cls = self.registry.get(tag)
-        if cls is None:
-            raise ValueError(f"Unknown type tag: {tag}")
-
-        # Resolve postponed annotations (and forward refs) to real types
-        type_hints = self._hint_cache.get(cls)
-        if type_hints is None:
-            globalns = vars(sys.modules[cls.__module__])
-            localns = dict(vars(cls))  # Class locals + type parameters (PEP 695)
-            type_params = getattr(cls, "__type_params__", ())
-            for tp in type_params:
-                # tp is a TypeVar-like object with a __name__
-                localns[getattr(tp, "__name__", str(tp))] = tp
-            type_hints = get_type_hints(cls, globalns=globalns, localns=localns)
-            self._hint_cache[cls] = type_hints
-
-        kwargs = {}
-        for f in fields(cls):
-            if f.name in obj:
-                hint = type_hints.get(f.name, Any)
-                kwargs[f.name] = self.decode_with_hint(obj[f.name], hint)
-        return cls(**kwargs)
-
-    def dict_from_dataclass(self, obj: Any) -> Any:
-        if is_dataclass(obj):
-            type_tag = getattr(type(obj), "__tag__", type(obj).__name__)
-            out = {"type": type_tag}
-            for f in fields(obj):
-                out[f.name] = self.dict_from_dataclass(getattr(obj, f.name))
+    def union(self, base: type) -> Any:
+        """Every concrete registered struct deriving from `base`, as a tagged union."""
+        members = tuple(
+            cls
+            for cls in self.registry.values()
+            if issubclass(cls, base) and not inspect.isabstract(cls)
+        )
+        return Union[members]
+
+    def encode(self, obj: Any) -> bytes:
+        return self.encoder.encode(obj)
+
+    def decode(self, payload: bytes, hint: Any) -> Any:
+        decoder = self._decoders.get(hint)
+        if decoder is None:
+            decoder = msgspec.msgpack.Decoder(hint, dec_hook=dec_hook)
+            self._decoders[hint] = decoder
+        try:
+            return decoder.decode(payload)
+        except msgspec.ValidationError:
+            # Payloads written under an old tag name
+            legacy = self.rename_tags(msgspec.msgpack.decode(payload))
+            return self.from_builtins(legacy, hint)
+
+    def rename_tags(self, obj: Any) -> Any:
+        if isinstance(obj, dict):
+            out = {k: self.rename_tags(v) for k, v in obj.items()}
+            tag = out.get("type")
+            if isinstance(tag, str) and tag in self.aliases:
+                out["type"] = self.aliases[tag]
             return out
         if isinstance(obj, list):
-            return [self.dict_from_dataclass(x) for x in obj]
-        if isinstance(obj, dict):
-            return {k: self.dict_from_dataclass(v) for k, v in obj.items()}
+            return [self.rename_tags(x) for x in obj]
         return obj
+
+    def to_builtins(self, obj: Any) -> Any:
+        return msgspec.to_builtins(obj, enc_hook=enc_hook)
+
+    def from_builtins(self, obj: Any, hint: Any, *, str_keys: bool = False) -> Any:
+        return msgspec.convert(obj, hint, dec_hook=dec_hook, str_keys=str_keys)
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from msgspec import Struct
 
 from chance_sprite.message_cache.roll_record_base import RollRecordBase
 
 
-@dataclass(frozen=True, kw_only=True)
-class MessageRecord[R: RollRecordBase]:
+class MessageRecord[R: RollRecordBase](
+    Struct, frozen=True, kw_only=True, tag_field="type", tag=True
+):
     message_id: int
     guild_id: int | None
     channel_id: int
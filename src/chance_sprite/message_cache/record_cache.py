@@ -0,0 +1,62 @@
+# record_cache.py
+from __future__ import annotations
+
+from collections import OrderedDict
+
+
+class RecordCache[V]:
+    """
+    Bounded LRU of decoded records, sized by their encoded length so a few
+    huge rolls can't crowd out many small ones.
+    """
+
+    def __init__(self, max_bytes: int = 4 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._records: OrderedDict[int, tuple[V, int]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, record_id: int) -> V | None:
+        entry = self._records.get(record_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._records.move_to_end(record_id)
+        self.hits += 1
+        return entry[0]
+
+    def peek(self, record_id: int) -> V | None:
+        """Like get(), without touching the order or the stats."""
+        entry = self._records.get(record_id)
+        return entry[0] if entry is not None else None
+
+    def put(self, record_id: int, record: V, size: int) -> None:
+        self.discard(record_id)
+        if size > self.max_bytes:
+            return
+        self._records[record_id] = (record, size)
+        self.size += size
+        while self.size > self.max_bytes:
+            (_, (_, evicted)) = self._records.popitem(last=False)
+            self.size -= evicted
+
+    def discard(self, record_id: int) -> None:
+        entry = self._records.pop(record_id, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def clear(self) -> None:
+        self._records.clear()
+        self.size = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __contains__(self, record_id: int) -> bool:
+        return record_id in self._records
+
+    def __len__(self) -> int:
+        return len(self._records)
@@ -1,18 +1,29 @@
 from __future__ import annotations
 
-from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from abc import ABCMeta, abstractmethod
 from typing import TYPE_CHECKING
 
 from discord import ui
+from msgspec import Struct, StructMeta
 
 if TYPE_CHECKING:
     from chance_sprite.message_cache.message_record import MessageRecord
     from chance_sprite.sprite_context import InteractionContext
 
 
-@dataclass(frozen=True, kw_only=True)
-class RollRecordBase(ABC):
+# Lets the record structs declare abstract methods
+class RecordMeta(StructMeta, ABCMeta):
+    pass
+
+
+class RollRecordBase(
+    Struct,
+    metaclass=RecordMeta,
+    frozen=True,
+    kw_only=True,
+    tag_field="type",
+    tag=True,
+):
     @abstractmethod
     def build_view(self, label: str, context: InteractionContext) -> ui.LayoutView:
         raise NotImplementedError
@@ -26,8 +37,7 @@ class RollRecordBase(ABC):
         return [record.owner_id]
 
 
-@dataclass(frozen=True, kw_only=True)
-class ResistableRoll(RollRecordBase):
+class ResistableRoll(RollRecordBase, kw_only=True):
     resistable: bool = True
 
     @abstractmethod
@@ -1,8 +1,7 @@
-from dataclasses import dataclass
+from msgspec import Struct
 
 
-@dataclass(frozen=True)
-class WebhookHandle:
+class WebhookHandle(Struct, frozen=True, tag_field="type", tag=True):
     message_id: int
     webhook_id: int
     expires_at: int
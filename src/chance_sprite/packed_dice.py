@@ -0,0 +1,142 @@
+# packed_dice.py
+from __future__ import annotations
+
+import random
+from collections.abc import Iterable, Iterator, Sequence
+from typing import overload
+
+# 252 is the largest multiple of 6 that fits in a byte. Bytes below it map evenly
+# onto faces 1-6; the rest are dropped so every face stays equally likely.
+_ACCEPTED_BYTES = 252
+_FACE_TABLE = bytes(b % 6 + 1 for b in range(_ACCEPTED_BYTES)) + bytes(
+    256 - _ACCEPTED_BYTES
+)
+_REJECTED_BYTES = bytes(range(_ACCEPTED_BYTES, 256))
+
+# Replayed pools are regenerated in chunks of this many random bytes.
+# Changing it changes every replayed roll, so it must stay fixed.
+_REPLAY_CHUNK = 64
+
+# Faces are stored as octal digits 1-6 when encoded. There is never a 0 digit,
+# so the int round-trips without having to store the pool length.
+_TO_OCTAL = bytes.maketrans(bytes(range(1, 7)), b"123456")
+_FROM_OCTAL = bytes.maketrans(b"123456", bytes(range(1, 7)))
+
+
+def faces_from_bytes(raw: bytes) -> bytes:
+    """Turn random bytes into faces 1-6, dropping the bytes that would bias them."""
+    return raw.translate(_FACE_TABLE, _REJECTED_BYTES)
+
+
+def replay_faces(seed: int, draws: int) -> bytes:
+    rng = random.Random(seed)
+    faces = b""
+    while len(faces) < draws:
+        faces += faces_from_bytes(rng.randbytes(_REPLAY_CHUNK))
+    return faces[:draws]
+
+
+class PackedDice(Sequence[int]):
+    """
+    Immutable dice pool, one byte per face. Behaves like a tuple of ints for
+    rendering, and encodes to a 3-bit-per-die blob for storage.
+    """
+
+    __slots__ = ("_faces",)
+
+    def __init__(self, faces: bytes | Iterable[int] = b""):
+        self._faces = faces if type(faces) is bytes else bytes(faces)
+
+    @classmethod
+    def decode(cls, value: bytes | dict[str, int] | Iterable[int]) -> PackedDice:
+        if isinstance(value, dict):
+            return ReplayDice(value["seed"], value["draws"])
+        # Older records stored dice as a plain list of faces
+        if not isinstance(value, (bytes, bytearray)):
+            return cls(value)
+        if not value:
+            return cls()
+        digits = format(int.from_bytes(value, "big"), "o").encode()
+        return cls(digits.translate(_FROM_OCTAL))
+
+    def encode(self) -> bytes | dict[str, int]:
+        if not self._faces:
+            return b""
+        packed = int(self._faces.translate(_TO_OCTAL), 8)
+        return packed.to_bytes((packed.bit_length() + 7) // 8, "big")
+
+    def __len__(self) -> int:
+        return len(self._faces)
+
+    @overload
+    def __getitem__(self, index: int) -> int: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> PackedDice: ...
+
+    def __getitem__(self, index: int | slice) -> int | PackedDice:
+        if isinstance(index, slice):
+            return PackedDice(self._faces[index])
+        return self._faces[index]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._faces)
+
+    def __contains__(self, face: object) -> bool:
+        return isinstance(face, int) and 1 <= face <= 6 and face in self._faces
+
+    def count(self, face: int) -> int:
+        return self._faces.count(face)
+
+    def __add__(self, other: Iterable[int]) -> PackedDice:
+        return PackedDice(self._faces + bytes(other))
+
+    def __radd__(self, other: Iterable[int]) -> PackedDice:
+        return PackedDice(bytes(other) + self._faces)
+
+    def __bytes__(self) -> bytes:
+        return self._faces
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, PackedDice):
+            return self._faces == other._faces
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self._faces)
+
+    def __repr__(self) -> str:
+        return f"PackedDice({tuple(self._faces)!r})"
+
+
+class ReplayDice(PackedDice):
+    """
+    Dice pool stored as a seed and a draw counter. The faces are the first
+    `draws` faces of the seeded stream, rebuilt the first time they're read.
+    Extending the pool keeps drawing from the same stream.
+    """
+
+    __slots__ = ("seed", "draws")
+
+    def __init__(self, seed: int, draws: int):
+        self.seed = seed
+        self.draws = draws
+
+    def __getattr__(self, name: str):
+        # Only reached while the _faces slot is still empty
+        if name == "_faces":
+            self._faces = replay_faces(self.seed, self.draws)
+            return self._faces
+        raise AttributeError(name)
+
+    def extended(self, count: int) -> ReplayDice:
+        return ReplayDice(self.seed, self.draws + count)
+
+    def encode(self) -> dict[str, int]:
+        return {"seed": self.seed, "draws": self.draws}
+
+    def __len__(self) -> int:
+        return self.draws
+
+    def __repr__(self) -> str:
+        return f"ReplayDice(seed={self.seed}, draws={self.draws})"
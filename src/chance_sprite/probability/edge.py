@@ -0,0 +1,29 @@
+# edge.py
+from __future__ import annotations
+
+from functools import lru_cache
+from math import comb
+
+from chance_sprite.probability.exploding import exploding_odds
+from chance_sprite.probability.hits import P_HIT
+
+
+@lru_cache(maxsize=4096)
+def second_chance_gain(dice_hits: int, rerolled: int, limit: int = 0) -> float:
+    """
+    Expected change in hits_limited from rerolling `rerolled` misses. Works
+    straight off the binomial rather than the joint tables, so it stays cheap
+    the first time a big pool asks.
+    """
+    room = limit - dice_hits if limit > 0 else rerolled
+    if room <= 0 or rerolled <= 0:
+        return 0.0
+    return sum(
+        min(room, k) * comb(rerolled, k) * P_HIT**k * (1 - P_HIT) ** (rerolled - k)
+        for k in range(1, rerolled + 1)
+    )
+
+
+def push_the_limit_gain(dice_hits: int, hits_limited: int, edge: int) -> float:
+    """Expected change in hits_limited from pushing with `edge` exploding dice."""
+    return dice_hits - hits_limited + exploding_odds(edge).expected_hits
@@ -0,0 +1,141 @@
+# exploding.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from math import comb
+from typing import Iterable
+
+from chance_sprite.probability.hits import HitsOdds, hits_odds, joint_table
+
+# A chain is one die plus everything its sixes explode into. It scores no hits
+# 2/3 of the time, and k hits with probability 5/3 * 6^-k otherwise.
+P_CHAIN_BLANK = 2 / 3
+P_CHAIN_ONE = 1 / 5  # A chain ends on a 1, which counts towards a glitch
+
+# Explosion chains never end, so distributions are cut off once the tail drops below this
+TAIL_EPSILON = 1e-15
+
+
+def _trim(dist: list[float]) -> tuple[float, ...]:
+    end = len(dist)
+    while end > 1 and dist[end - 1] < TAIL_EPSILON:
+        end -= 1
+    return tuple(dist[:end])
+
+
+@lru_cache(maxsize=256)
+def chain_hits_table(chains: int) -> tuple[float, ...]:
+    """
+    P(total hits == k) for `chains` exploding dice, with the tail trimmed. Built
+    from the table one chain smaller: convolving with the geometric chain tail
+    is a running sum, so each step is linear in the table length.
+    """
+    if chains <= 0:
+        return (1.0,)
+    prev = chain_hits_table(chains - 1)
+    dist = []
+    tail = 0.0  # sum over k >= 1 of prev[h - k] * 5/3 * 6^-k
+    for h in range(len(prev) + 1):
+        if h > 0:
+            tail = (tail + prev[h - 1] * 5 / 3) / 6
+        blank = prev[h] * P_CHAIN_BLANK if h < len(prev) else 0.0
+        dist.append(blank + tail)
+    # Keep going until the geometric tail is negligible
+    while tail >= TAIL_EPSILON:
+        tail /= 6
+        dist.append(tail)
+    return _trim(dist)
+
+
+@lru_cache(maxsize=256)
+def explosions_table(dice: int) -> tuple[float, ...]:
+    """P(sum(counted_explosions) == e): negative binomial over the pool's sixes."""
+    if dice <= 0:
+        return (1.0,)
+    dist = []
+    e = 0
+    while True:
+        p = comb(e + dice - 1, e) * (1 / 6) ** e * (5 / 6) ** dice
+        dist.append(p)
+        if p < TAIL_EPSILON and e > dice / 5:
+            break
+        e += 1
+    return _trim(dist)
+
+
+@dataclass(frozen=True)
+class ExplodingOdds(HitsOdds):
+    explosions: tuple[float, ...]  # explosions[e] = P(sum(counted_explosions) == e)
+
+    @property
+    def expected_explosions(self) -> float:
+        return max(self.dice, 0) / 5
+
+
+@lru_cache(maxsize=4096)
+def exploding_odds(dice: int, gremlins: int = 0) -> ExplodingOdds:
+    """
+    Exact odds for roll_exploding, with `dice` the adjusted pool size. Only the
+    counted dice explode, so an adjusted pool is the same as a fresh one that size.
+    Limits don't apply to Break the Limit, so `hits` is the dice_hits distribution.
+    """
+    pool = max(dice, 0)
+    glitch = 0.0
+    critical = 0.0
+    # No hits on the base dice means nothing exploded
+    blank_ones = joint_table(pool)[0]
+    for ones in range(pool + 1):
+        if ones * 2 + gremlins * 2 > dice:
+            glitch += (
+                comb(pool, ones)
+                * P_CHAIN_ONE**ones
+                * (1 - P_CHAIN_ONE) ** (pool - ones)
+            )
+            critical += blank_ones[ones]
+
+    return ExplodingOdds(
+        dice=dice,
+        limit=0,
+        gremlins=gremlins,
+        hits=chain_hits_table(pool),
+        glitch_chance=glitch,
+        critical_glitch_chance=critical,
+        explosions=explosions_table(pool),
+    )
+
+
+def exploding_odds_many(
+    pool_sizes: Iterable[int], gremlins: int = 0
+) -> list[ExplodingOdds]:
+    """
+    Odds for many pool sizes at once. Each size's table is built from the one
+    a die smaller, so filling them smallest first is a single pass up to the
+    largest pool, and the per-size caches stand in for array vectorization.
+    """
+    sizes = list(pool_sizes)
+    for size in sorted(set(sizes)):
+        chain_hits_table(max(size, 0))
+    return [exploding_odds(size, gremlins) for size in sizes]
+
+
+@lru_cache(maxsize=4096)
+def push_the_limit_odds(dice: int, edge: int, gremlins: int = 0) -> HitsOdds:
+    """
+    Exact odds for push_the_limit: the base roll ignores its limit, and `edge`
+    extra dice explode. Glitches only come from the base roll.
+    """
+    base = hits_odds(dice, 0, gremlins)
+    extra = chain_hits_table(max(edge, 0))
+    hits = [0.0] * (len(base.hits) + len(extra) - 1)
+    for i, p in enumerate(base.hits):
+        for j, q in enumerate(extra):
+            hits[i + j] += p * q
+    return HitsOdds(
+        dice=dice,
+        limit=0,
+        gremlins=gremlins,
+        hits=_trim(hits),
+        glitch_chance=base.glitch_chance,
+        critical_glitch_chance=base.critical_glitch_chance,
+    )
@@ -0,0 +1,93 @@
+# extended.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+
+from chance_sprite.probability.hits import hits_odds
+
+
+@dataclass(frozen=True)
+class ExtendedOdds:
+    dice: int
+    threshold: int
+    max_iters: int
+    limit: int
+    success_chance: float
+    intervals: tuple[float, ...]  # intervals[i] = P(iters_used == i)
+    success_intervals: tuple[float, ...]  # P(succeeding on interval i)
+    final_hits: tuple[float, ...]  # final_hits[k] = P(final_hits == k)
+
+    @cached_property
+    def expected_intervals(self) -> float:
+        return sum(i * p for i, p in enumerate(self.intervals))
+
+    @cached_property
+    def expected_intervals_to_success(self) -> float:
+        """Mean intervals taken, counting only the runs that succeed."""
+        if self.success_chance <= 0:
+            return 0.0
+        weighted = sum(i * p for i, p in enumerate(self.success_intervals))
+        return weighted / self.success_chance
+
+    @cached_property
+    def expected_net_hits(self) -> float:
+        return sum((k - self.threshold) * p for k, p in enumerate(self.final_hits))
+
+
+@lru_cache(maxsize=1024)
+def extended_odds(
+    dice: int, threshold: int, max_iters: int, limit: int = 0
+) -> ExtendedOdds:
+    """
+    Exact odds for roll_extended, by DP over (interval, cumulative hits). Runs
+    that reach the threshold stop there, so only the cumulative totals still
+    short of it are carried into the next interval.
+    """
+    threshold = max(threshold, 0)
+    # pending[c] = P(still rolling with c hits so far)
+    pending = [0.0] * max(threshold, 1)
+    pending[0] = 1.0
+    intervals = [0.0]
+    success_intervals = [0.0]
+    final_hits = [0.0] * (max(threshold, 1) + max(dice, 0))
+
+    for i in range(1, max_iters + 1):
+        pool = dice - (i - 1)
+        if pool < 1 or threshold == 0:
+            break
+        hits = hits_odds(pool, limit).hits
+        next_pending = [0.0] * threshold
+        succeeded = 0.0
+        for c, pc in enumerate(pending):
+            if pc == 0.0:
+                continue
+            for h, ph in enumerate(hits):
+                p = pc * ph
+                total = c + h
+                if total >= threshold:
+                    succeeded += p
+                    final_hits[total] += p
+                else:
+                    next_pending[total] += p
+        pending = next_pending
+        intervals.append(succeeded)
+        success_intervals.append(succeeded)
+
+    # Whatever is still pending ran out of intervals (or dice) on its last roll
+    stopped = sum(pending)
+    if stopped > 0.0:
+        intervals[-1] += stopped
+        for c, pc in enumerate(pending):
+            final_hits[c] += pc
+
+    return ExtendedOdds(
+        dice=dice,
+        threshold=threshold,
+        max_iters=max_iters,
+        limit=limit,
+        success_chance=sum(success_intervals),
+        intervals=tuple(intervals),
+        success_intervals=tuple(success_intervals),
+        final_hits=tuple(final_hits),
+    )
@@ -0,0 +1,105 @@
+# hits.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from itertools import accumulate
+from typing import Iterable
+
+# Per-die outcomes: 5-6 is a hit, 1 counts towards a glitch, 2-4 is neither
+P_HIT = 1 / 3
+P_ONE = 1 / 6
+P_OTHER = 1 / 2
+
+
+@lru_cache(maxsize=256)
+def joint_table(dice: int) -> tuple[tuple[float, ...], ...]:
+    """
+    Exact P(hits, ones) for a pool, as table[hits][ones]. Row `h` only holds
+    the ones counts that still fit in the pool. Each table is built from the
+    one a die smaller, so a cold 99-die lookup fills in every smaller pool too.
+    """
+    if dice <= 0:
+        return ((1.0,),)
+    prev = joint_table(dice - 1)
+    rows = []
+    for hits in range(dice + 1):
+        row = []
+        for ones in range(dice - hits + 1):
+            p = 0.0
+            if hits > 0:
+                p += prev[hits - 1][ones] * P_HIT
+            if hits < dice:
+                if ones > 0:
+                    p += prev[hits][ones - 1] * P_ONE
+                if ones < dice - hits:
+                    p += prev[hits][ones] * P_OTHER
+            row.append(p)
+        rows.append(tuple(row))
+    return tuple(rows)
+
+
+@dataclass(frozen=True)
+class HitsOdds:
+    dice: int
+    limit: int
+    gremlins: int
+    hits: tuple[float, ...]  # hits[k] = P(hits_limited == k)
+    glitch_chance: float  # any glitch, critical included
+    critical_glitch_chance: float
+
+    @cached_property
+    def expected_hits(self) -> float:
+        return sum(k * p for k, p in enumerate(self.hits))
+
+    @cached_property
+    def _tail(self) -> tuple[float, ...]:
+        # _tail[k] = P(hits_limited >= k)
+        return tuple(accumulate(reversed(self.hits)))[::-1] + (0.0,)
+
+    def at_least(self, threshold: int) -> float:
+        if threshold <= 0:
+            return 1.0
+        return self._tail[min(threshold, len(self.hits))]
+
+
+@lru_cache(maxsize=4096)
+def hits_odds(dice: int, limit: int = 0, gremlins: int = 0) -> HitsOdds:
+    """Exact odds for roll_hits(dice, limit=limit, gremlins=gremlins)."""
+    table = joint_table(max(dice, 0))
+    max_hits = len(table) - 1
+    if limit > 0:
+        max_hits = min(limit, max_hits)
+
+    hits = [0.0] * (max_hits + 1)
+    glitch = 0.0
+    critical = 0.0
+    for raw_hits, row in enumerate(table):
+        limited = min(raw_hits, max_hits)
+        for ones, p in enumerate(row):
+            hits[limited] += p
+            # Same rule as HitsResult.glitch
+            if ones * 2 + gremlins * 2 > dice:
+                glitch += p
+                if raw_hits == 0:
+                    critical += p
+
+    return HitsOdds(
+        dice=dice,
+        limit=limit,
+        gremlins=gremlins,
+        hits=tuple(hits),
+        glitch_chance=glitch,
+        critical_glitch_chance=critical,
+    )
+
+
+def hits_odds_many(queries: Iterable[tuple[int, int, int]]) -> list[HitsOdds]:
+    """Odds for many (dice, limit, gremlins) queries at once."""
+    return [hits_odds(dice, limit, gremlins) for dice, limit, gremlins in queries]
+
+
+def success_chance(
+    dice: int, threshold: int, limit: int = 0, gremlins: int = 0
+) -> float:
+    return hits_odds(dice, limit, gremlins).at_least(threshold)
@@ -0,0 +1,124 @@
+# opposed.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from itertools import accumulate
+from typing import Iterable
+
+from chance_sprite.probability.exploding import exploding_odds
+from chance_sprite.probability.hits import hits_odds
+
+
+def pool_hits(dice: int, limit: int = 0, pre_edge: bool = False) -> tuple[float, ...]:
+    """Hits distribution for one side, as roll_hits or (pre-edged) roll_exploding."""
+    if pre_edge:
+        return exploding_odds(dice).hits
+    return hits_odds(dice, limit).hits
+
+
+@lru_cache(maxsize=512)
+def _tail(hits: tuple[float, ...]) -> tuple[float, ...]:
+    # _tail[k] = P(hits >= k), padded so any defender total can index it
+    return tuple(accumulate(reversed(hits)))[::-1] + (0.0,)
+
+
+def _mean(dist: tuple[float, ...]) -> float:
+    return sum(k * p for k, p in enumerate(dist))
+
+
+@dataclass(frozen=True)
+class OpposedOdds:
+    initiator: tuple[float, ...]
+    defender: tuple[float, ...]
+
+    @cached_property
+    def win_chance(self) -> float:
+        """P(initiator hits > defender hits)."""
+        tail = _tail(self.initiator)
+        last = len(tail) - 1
+        return sum(p * tail[min(d + 1, last)] for d, p in enumerate(self.defender))
+
+    @cached_property
+    def tie_chance(self) -> float:
+        return sum(p * q for p, q in zip(self.initiator, self.defender))
+
+    @property
+    def loss_chance(self) -> float:
+        return max(0.0, 1.0 - self.win_chance - self.tie_chance)
+
+    @cached_property
+    def net_hits(self) -> tuple[float, ...]:
+        """net_hits[i] = P(initiator - defender == i - net_offset)."""
+        dist = [0.0] * (len(self.initiator) + len(self.defender) - 1)
+        offset = self.net_offset
+        for d, q in enumerate(self.defender):
+            for i, p in enumerate(self.initiator):
+                dist[i - d + offset] += p * q
+        return tuple(dist)
+
+    @property
+    def net_offset(self) -> int:
+        return len(self.defender) - 1
+
+    def net_chance(self, net: int) -> float:
+        index = net + self.net_offset
+        return self.net_hits[index] if 0 <= index < len(self.net_hits) else 0.0
+
+    @cached_property
+    def expected_net_hits(self) -> float:
+        return _mean(self.initiator) - _mean(self.defender)
+
+
+@lru_cache(maxsize=4096)
+def opposed_odds(
+    initiator_dice: int,
+    defender_dice: int,
+    initiator_limit: int = 0,
+    defender_limit: int = 0,
+    pre_edge: bool = False,
+) -> OpposedOdds:
+    """Exact odds for roll_opposed. Ties go to the defender."""
+    return OpposedOdds(
+        initiator=pool_hits(initiator_dice, initiator_limit, pre_edge),
+        defender=pool_hits(defender_dice, defender_limit),
+    )
+
+
+def availability_odds(
+    acquisition_dice: int,
+    availability: int,
+    social_limit: int = 0,
+    street_cred_mod: int = 0,
+    pre_edge: bool = False,
+) -> OpposedOdds:
+    """
+    Exact odds for roll_availability. The item is acquired on a win or a tie,
+    so the chance of getting it is win_chance + tie_chance.
+    """
+    return opposed_odds(
+        acquisition_dice, availability + street_cred_mod, social_limit, 0, pre_edge
+    )
+
+
+def availability_sweep(
+    acquisition_dice: int,
+    availabilities: Iterable[int],
+    street_cred_mods: Iterable[int] = (0,),
+    social_limit: int = 0,
+    pre_edge: bool = False,
+) -> dict[tuple[int, int], OpposedOdds]:
+    """
+    Odds for every (availability, street cred mod) pair against one negotiation
+    pool. The negotiation side is only looked up once, and the net hits
+    distributions are only convolved if they're asked for.
+    """
+    initiator = pool_hits(acquisition_dice, social_limit, pre_edge)
+    mods = tuple(street_cred_mods)
+    return {
+        (availability, mod): OpposedOdds(
+            initiator=initiator, defender=pool_hits(availability + mod)
+        )
+        for availability in availabilities
+        for mod in mods
+    }
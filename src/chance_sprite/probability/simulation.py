@@ -0,0 +1,282 @@
+# simulation.py
+from __future__ import annotations
+
+import asyncio
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import cache, partial
+from types import SimpleNamespace
+from typing import Any, Callable, Iterable, Optional
+
+from chance_sprite.probability.hits import P_HIT
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, the pure-Python path gives the same answers
+    np = None
+
+DEFAULT_TRIALS = 100_000
+
+
+@dataclass(frozen=True)
+class SimulationResult:
+    trials: int
+    success_chance: float
+    # value -> fraction of trials
+    net_hits: dict[int, float]
+    drain_taken: dict[int, float]
+    services: dict[int, float]
+
+    @staticmethod
+    def mean(dist: dict[int, float]) -> float:
+        return sum(value * p for value, p in dist.items())
+
+
+# === BACKENDS ===
+# The composite rules below are written once against this small namespace. With
+# numpy they run on whole arrays of trials; without it they run per trial on ints.
+_numpy_ops = SimpleNamespace(maximum=np.maximum) if np is not None else None
+_scalar_ops = SimpleNamespace(maximum=max)
+
+
+def _numpy_hits(gen, dice: int, limit: int, exploding: bool, trials: int):
+    pool = np.full(trials, max(dice, 0))
+    hits = gen.binomial(pool, P_HIT)
+    if exploding:
+        # Half of all hits are sixes, and each six rolls again
+        sixes = gen.binomial(hits, 0.5)
+        while sixes.any():
+            extra = gen.binomial(sixes, P_HIT)
+            hits += extra
+            sixes = gen.binomial(extra, 0.5)
+    elif limit > 0:
+        hits = np.minimum(hits, limit)
+    return hits
+
+
+def _python_hits(gen: random.Random, dice: int, limit: int, exploding: bool) -> int:
+    pool = max(dice, 0)
+    hits = gen.binomialvariate(pool, P_HIT) if pool else 0
+    if exploding:
+        sixes = gen.binomialvariate(hits, 0.5) if hits else 0
+        while sixes:
+            extra = gen.binomialvariate(sixes, P_HIT)
+            hits += extra
+            sixes = gen.binomialvariate(extra, 0.5) if extra else 0
+    elif limit > 0:
+        hits = min(hits, limit)
+    return hits
+
+
+def _distribution(values, trials: int) -> dict[int, float]:
+    if np is not None and isinstance(values, np.ndarray):
+        keys, counts = np.unique(values, return_counts=True)
+        return {int(k): int(c) / trials for k, c in zip(keys, counts)}
+    return {k: c / trials for k, c in sorted(Counter(values).items())}
+
+
+def _simulate(
+    pools: dict[str, tuple[int, int, bool]],
+    rule: Callable[..., tuple[Any, Any, Any, Any]],
+    trials: int,
+    seed: Optional[int],
+    use_numpy: Optional[bool],
+) -> SimulationResult:
+    # pools maps each roll to (dice, limit, exploding); rule turns the rolled hits
+    # into (success, net hits, drain taken, services)
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy:
+        if np is None:
+            raise RuntimeError("numpy is not installed")
+        gen = np.random.default_rng(seed)
+        rolled = {
+            name: _numpy_hits(gen, *spec, trials=trials)
+            for name, spec in pools.items()
+        }
+        success, net, drain, services = rule(_numpy_ops, **rolled)
+        success_chance = float(np.mean(success))
+    else:
+        gen = random.Random(seed)
+        outcomes = [
+            rule(
+                _scalar_ops,
+                **{name: _python_hits(gen, *spec) for name, spec in pools.items()},
+            )
+            for _ in range(trials)
+        ]
+        success, net, drain, services = zip(*outcomes)
+        success_chance = sum(success) / trials
+
+    return SimulationResult(
+        trials=trials,
+        success_chance=success_chance,
+        net_hits=_distribution(net, trials),
+        drain_taken=_distribution(drain, trials),
+        services=_distribution(services, trials),
+    )
+
+
+# === COMPOSITE ROLLS ===
+# Each mirrors its roll command's arguments. Pre-edged pools count the rules
+# total of their exploding hits: every hit once, sixes rolling again. The bot's
+# BreakTheLimitHitsResult.hits_limited adds the exploded hits on top of a
+# dice_hits that already includes them, so for pre-edged rolls it shows more
+# hits than simulated here, and drain, services and net hits shift to match.
+
+
+def simulate_spell(
+    *,
+    force: int,
+    cast_dice: int,
+    drain_dice: int,
+    drain_code: int,
+    limit_override: Optional[int] = None,
+    pre_edge: bool = False,
+    opposing_pool: Optional[int] = None,
+    trials: int = DEFAULT_TRIALS,
+    seed: Optional[int] = None,
+    use_numpy: Optional[bool] = None,
+) -> SimulationResult:
+    drain_value = force + drain_code
+
+    def rule(ops, cast, drain, opposition):
+        net = cast - opposition
+        taken = ops.maximum(drain_value - drain, 0) if drain_value > 0 else drain * 0
+        return net > 0 if opposing_pool else cast > 0, net, taken, net * 0
+
+    return _simulate(
+        {
+            "cast": (cast_dice, limit_override or force, pre_edge),
+            "drain": (drain_dice, 0, False),
+            "opposition": (opposing_pool or 0, 0, False),
+        },
+        rule,
+        trials,
+        seed,
+        use_numpy,
+    )
+
+
+def simulate_alchemy_create(
+    *,
+    force: int,
+    alchemy_dice: int,
+    drain_code: int,
+    drain_dice: int,
+    limit_override: Optional[int] = None,
+    pre_edge: bool = False,
+    trials: int = DEFAULT_TRIALS,
+    seed: Optional[int] = None,
+    use_numpy: Optional[bool] = None,
+) -> SimulationResult:
+    drain_value = force + drain_code
+
+    def rule(ops, cast, resist, drain):
+        potency = ops.maximum(cast - resist, 0)
+        taken = ops.maximum(drain_value - drain, 0) if drain_value > 0 else drain * 0
+        return potency > 0, potency, taken, potency * 0
+
+    return _simulate(
+        {
+            "cast": (alchemy_dice, limit_override or force, pre_edge),
+            "resist": (force, 0, False),
+            "drain": (drain_dice, 0, False),
+        },
+        rule,
+        trials,
+        seed,
+        use_numpy,
+    )
+
+
+def _spirit_drain(ops, resist, drain, drain_adjust: int):
+    drain_value = ops.maximum(ops.maximum(2 * resist, 2) + drain_adjust, 0)
+    return ops.maximum(drain_value - drain, 0)
+
+
+def simulate_summon(
+    *,
+    force: int,
+    summon_dice: int,
+    drain_dice: int,
+    limit_override: Optional[int] = None,
+    drain_adjust: int = 0,
+    pre_edge: bool = False,
+    trials: int = DEFAULT_TRIALS,
+    seed: Optional[int] = None,
+    use_numpy: Optional[bool] = None,
+) -> SimulationResult:
+    def rule(ops, summon, resist, drain):
+        net = summon - resist
+        services = ops.maximum(net, 0)
+        return net > 0, net, _spirit_drain(ops, resist, drain, drain_adjust), services
+
+    return _simulate(
+        {
+            "summon": (summon_dice, limit_override or force, pre_edge),
+            "resist": (force, 0, False),
+            "drain": (drain_dice, 0, False),
+        },
+        rule,
+        trials,
+        seed,
+        use_numpy,
+    )
+
+
+def simulate_binding(
+    *,
+    force: int,
+    bind_dice: int,
+    drain_dice: int,
+    services_in: int,
+    limit: Optional[int] = None,
+    drain_adjust: int = 0,
+    pre_edge: bool = False,
+    trials: int = DEFAULT_TRIALS,
+    seed: Optional[int] = None,
+    use_numpy: Optional[bool] = None,
+) -> SimulationResult:
+    def rule(ops, bind, resist, drain):
+        net = bind - resist
+        services = max(0, services_in - 1) + ops.maximum(net, 0)
+        return net > 0, net, _spirit_drain(ops, resist, drain, drain_adjust), services
+
+    return _simulate(
+        {
+            "bind": (bind_dice, limit or force, pre_edge),
+            "resist": (force * 2, 0, False),
+            "drain": (drain_dice, 0, False),
+        },
+        rule,
+        trials,
+        seed,
+        use_numpy,
+    )
+
+
+# === PROCESS POOL ===
+
+
+@cache
+def _process_pool() -> ProcessPoolExecutor:
+    return ProcessPoolExecutor()
+
+
+async def simulate_in_process(
+    simulate: Callable[..., SimulationResult], /, **kwargs: Any
+) -> SimulationResult:
+    """Run one simulate_* call in the shared process pool, off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_process_pool(), partial(simulate, **kwargs))
+
+
+async def simulate_sweep(
+    simulate: Callable[..., SimulationResult], sweep: Iterable[dict[str, Any]]
+) -> list[SimulationResult]:
+    """Run a simulate_* call for each set of arguments, spread over the process pool."""
+    jobs = [simulate_in_process(simulate, **kwargs) for kwargs in sweep]
+    return list(await asyncio.gather(*jobs))
@@ -8,8 +8,18 @@ from .hits_result import HitsResult
 from .push_limit_result import PushTheLimitHitsResult
 from .second_chance_result import SecondChanceHitsResult
 
+# Any result a hits roll can turn into, told apart by its "type" tag when decoded
+type AnyHitsResult = (
+    HitsResult
+    | BreakTheLimitHitsResult
+    | SecondChanceHitsResult
+    | PushTheLimitHitsResult
+    | CloseCallResult
+)
+
 __all__ = [
     "AdditiveResult",
+    "AnyHitsResult",
     "BreakTheLimitHitsResult",
     "CloseCallResult",
     "HitsResult",
@@ -1,20 +1,27 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from msgspec import Struct
 
+from chance_sprite.packed_dice import PackedDice
 from chance_sprite.sprite_context import InteractionContext
+from chance_sprite.sprite_utils import render_faces
 
 
-@dataclass(frozen=True, kw_only=True)
-class AdditiveResult:
+class AdditiveResult(
+    Struct, frozen=True, kw_only=True, tag_field="type", tag=True
+):
     dice: int
-    rolls: tuple[int, ...]
+    rolls: PackedDice
 
     @property
     def total_roll(self):
         return sum(r for r in self.rolls)
 
     def render_dice(self, context: InteractionContext) -> str:
-        emojis = context.emoji_manager.packs.d6
-        line = "".join(emojis[x - 1] for x in self.rolls)
-        return line
+        return context.emoji_manager.render_cache.get(
+            ("additive", self.rolls), lambda: self._render_dice(context)
+        )
+
+    def _render_dice(self, context: InteractionContext) -> str:
+        compiled = context.emoji_manager.packs.compiled
+        return render_faces(bytes(self.rolls), compiled.d6)
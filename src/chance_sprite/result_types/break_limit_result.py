@@ -1,64 +1,65 @@
 from __future__ import annotations
 
-import random
-from dataclasses import dataclass, replace
-from functools import cached_property
-from itertools import zip_longest
-from typing import Iterable
+from msgspec.structs import force_setattr, replace
 
 from chance_sprite.result_types.hits_result import HitsResult
 
+from ..dice_source import DiceSource, default_dice_source
+from ..packed_dice import PackedDice
 from ..sprite_context import InteractionContext
-from ..sprite_utils import Glitch, _default_random
+from ..sprite_utils import (
+    Glitch,
+    compact_dice,
+    count_faces,
+    render_faces,
+    shift_face_counts,
+)
 
 
-@dataclass(frozen=True, kw_only=True)
-class BreakTheLimitHitsResult(HitsResult):
-    exploded_dice: tuple[tuple[int, ...], ...]
+class BreakTheLimitHitsResult(HitsResult, kw_only=True):
+    exploded_dice: tuple[PackedDice, ...]
+    # Face counts for the counted prefix of each explosion layer
+    explosion_face_counts: tuple[tuple[int, ...], ...] = ()
 
-    @cached_property
-    def base_sixes(self):
-        return sum(1 for r in self.counted_rolls if r == 6)
+    def __post_init__(self):
+        super().__post_init__()
+        if not self.explosion_face_counts:
+            force_setattr(self, "explosion_face_counts", self.count_explosions())
 
-    @cached_property
-    def counted_explosions(self):
+    def count_explosions(self) -> tuple[tuple[int, ...], ...]:
         index = 0
         count_this = self.base_sixes
-        counts = [count_this]
+        layer_counts = []
         while count_this > 0:
-            layer = self.exploded_dice[index][:count_this]
-            count_this = sum(1 for r in layer if r == 6)
-            counts.append(count_this)
+            counts = count_faces(self.exploded_dice[index][:count_this])
+            layer_counts.append(counts)
+            count_this = counts[5]
             index += 1
-        return counts
+        return tuple(layer_counts)
 
-    @cached_property
+    @property
+    def base_sixes(self):
+        return self.sixes
+
+    @property
+    def counted_explosions(self):
+        return [self.base_sixes, *(counts[5] for counts in self.explosion_face_counts)]
+
+    @property
     def rerolled_hits(self):
-        rerolled_hits = 0
-        for count, line in zip(self.counted_explosions, self.exploded_dice):
-            rerolled_hits += sum(1 for r in line[:count] if r in (5, 6))
-        return rerolled_hits
+        return sum(counts[4] + counts[5] for counts in self.explosion_face_counts)
 
-    @cached_property
+    @property
     def dice_hits(self) -> int:
-        base_hits = sum(1 for r in self.counted_rolls if r in (5, 6))
-        rerolled_hits = self.rerolled_hits
-        return base_hits + rerolled_hits
+        base_hits = self.face_counts[4] + self.face_counts[5]
+        return base_hits + self.rerolled_hits
 
-    @cached_property
+    @property
     def glitch(self) -> Glitch:
-        base_ones = sum(1 for r in self.counted_rolls if r == 1)
-        rerolled_ones = sum(
-            sum(1 for r in line[:count] if r == 1)
-            for (count, line) in zip(self.counted_explosions, self.exploded_dice)
-        )
-        ones = base_ones + rerolled_ones
-        if ones * 2 + self.gremlins * 2 > self.dice:
-            return Glitch.CRITICAL if self.dice_hits == 0 else Glitch.GLITCH
-        else:
-            return Glitch.NONE
+        rerolled_ones = sum(counts[0] for counts in self.explosion_face_counts)
+        return self.glitch_for_ones(self.ones + rerolled_ones)
 
-    @cached_property
+    @property
     def hits_limited(self):
         return self.dice_hits + self.rerolled_hits
 
@@ -68,54 +69,87 @@ class BreakTheLimitHitsResult(HitsResult):
         else:
             return f" **{self.dice_hits}** hit{'' if self.dice_hits == 1 else 's'}"
 
-    def choose_emojis(self, context: InteractionContext):
-        packs = context.emoji_manager.packs
-        chosen_emojis = (
-            packs.d6_ex
-            if (self.glitch == Glitch.NONE)
-            else context.emoji_manager.packs.d6_ex_glitch
-        )
-        limited_emojis = chosen_emojis
-        return chosen_emojis, limited_emojis
+    def choose_table(self, context: InteractionContext) -> tuple[str, ...]:
+        compiled = context.emoji_manager.packs.compiled
+        return compiled.d6_ex if self.glitch == Glitch.NONE else compiled.d6_ex_glitch
 
     def render_roll(self, context: InteractionContext):
-        (chosen_emojis, _) = self.choose_emojis(context)
+        key = (
+            "btl",
+            self.rolls,
+            self.exploded_dice,
+            self.original_dice,
+            self.dice,
+            self.limit,
+            self.glitch,
+            context.compact_dice,
+        )
+        return context.emoji_manager.render_cache.get(
+            key, lambda: self._render_roll(context)
+        )
+
+    def _render_roll(self, context: InteractionContext):
+        table = self.choose_table(context)
         line = f"`{self.dice}d6:`" + self.render_dice(context) + " "
         line += self.render_limited_hits()
         for roll in self.exploded_dice:
             line += f"\n`+`{context.emoji_manager.packs.btl}"
-            line += (
-                ""
-                + "".join(chosen_emojis[x - 1] for x in roll)
-                + f" **{sum(1 for r in roll if r in (5, 6))}** hits "
-            )
+            if context.compact_dice:
+                line += compact_dice(roll, None, table)
+            else:
+                line += render_faces(bytes(roll), table)
+            line += f" **{sum(1 for r in roll if r in (5, 6))}** hits "
         line += f"\n**{self.hits_limited}** Total Hits"
         return line
 
-    def adjust_dice(self, adjustment: int, rng: random.Random = _default_random):
+    def adjust_dice(self, adjustment: int, rng: DiceSource = default_dice_source):
         new_dice_adjustment: int = self.dice_adjustment + adjustment
         # Only roll new dice if the new adjustment exceeds the total number rolled
         new_dice_to_roll = self.original_dice + new_dice_adjustment - len(self.rolls)
         new_rolls = self.rolls
-        new_exploded_dice: tuple[tuple[int, ...], ...] = self.exploded_dice
+        new_exploded_dice = self.exploded_dice
         if new_dice_to_roll > 0:
-            additional_rolls = [rng.randint(1, 6) for _ in range(new_dice_to_roll)]
-            additional_explosions: list[tuple[int, ...]] = []
-            additional_sixes = sum(1 for r in additional_rolls if r == 6)
-            while True:
-                rerolls = tuple(rng.randint(1, 6) for _ in range(additional_sixes))
-                additional_explosions.append(rerolls)
-                sixes = sum(1 for r in rerolls if r == 6)
-                if sixes == 0:
-                    break
-            pairs: Iterable[tuple[tuple[int, ...], tuple[int, ...]]] = zip_longest(
-                new_exploded_dice, tuple(additional_explosions), fillvalue=tuple()
+            new_rolls = rng.extend(self.rolls, new_dice_to_roll)
+            layers = list(self.exploded_dice)
+            # Each new six explodes into the next layer, and so on down the chain
+            sixes = new_rolls[len(self.rolls) :].count(6)
+            index = 0
+            while sixes > 0:
+                if index < len(layers):
+                    previous = layers[index]
+                    layers[index] = rng.extend(previous, sixes)
+                    added = layers[index][len(previous) :]
+                else:
+                    added = rng.roll(sixes)
+                    layers.append(added)
+                sixes = added.count(6)
+                index += 1
+            new_exploded_dice = tuple(layers)
+        face_counts = self.shift_face_counts(
+            new_rolls, self.original_dice + new_dice_adjustment
+        )
+
+        # Each layer's counted prefix follows the sixes counted in the layer above
+        old_counts = self.explosion_face_counts
+        layer_counts = []
+        count_this = face_counts[5]
+        index = 0
+        while count_this > 0:
+            if index < len(old_counts):
+                previous, previous_len = old_counts[index], self.counted_explosions[index]
+            else:
+                previous, previous_len = (0,) * 6, 0
+            counts = shift_face_counts(
+                previous, new_exploded_dice[index], previous_len, count_this
             )
-            new_exploded_dice = tuple(a + b for a, b in pairs)
-            new_rolls = self.rolls + tuple(additional_rolls)
+            layer_counts.append(counts)
+            count_this = counts[5]
+            index += 1
         return replace(
             self,
             rolls=new_rolls,
             dice_adjustment=new_dice_adjustment,
             exploded_dice=new_exploded_dice,
+            face_counts=face_counts,
+            explosion_face_counts=tuple(layer_counts),
         )
@@ -1,46 +1,76 @@
 from __future__ import annotations
 
-import random
-from dataclasses import dataclass, replace
 from functools import cached_property
+from typing import Any
 
-from ..sprite_context import InteractionContext
-from ..sprite_utils import Glitch, _default_random, limit_mask
-
+from msgspec import Struct
+from msgspec.structs import asdict, force_setattr, replace
 
-@dataclass(frozen=True, kw_only=True)
-class HitsResult:
+from ..dice_source import DiceSource, default_dice_source
+from ..packed_dice import PackedDice
+from ..sprite_context import InteractionContext
+from ..sprite_utils import (
+    Glitch,
+    compact_dice,
+    count_faces,
+    face_digits,
+    limit_mask,
+    mark_limited,
+    render_faces,
+    shift_face_counts,
+)
+
+
+class HitsResult(
+    Struct, frozen=True, kw_only=True, tag_field="type", tag=True, dict=True
+):
     original_dice: int
-    rolls: tuple[int, ...]
+    rolls: PackedDice
     limit: int
     gremlins: int
     dice_adjustment: int = 0
+    # Counted from the dice when left empty, then stored with the result
+    face_counts: tuple[int, ...] = ()
 
-    @cached_property
+    def __post_init__(self):
+        if not self.face_counts:
+            force_setattr(self, "face_counts", count_faces(self.counted_rolls))
+
+    @property
     def limit_reached(self):
         return 0 < self.limit <= self.dice_hits
 
-    @cached_property
+    @property
     def dice(self):
         return self.original_dice + self.dice_adjustment
 
-    @cached_property
+    @property
     def counted_rolls(self):
         return self.rolls[: self.dice]
 
-    @cached_property
+    @property
+    def ones(self) -> int:
+        return self.face_counts[0]
+
+    @property
+    def sixes(self) -> int:
+        return self.face_counts[5]
+
+    @property
     def dice_hits(self):
-        return sum(1 for r in self.counted_rolls if r in (5, 6))
+        return self.face_counts[4] + self.face_counts[5]
 
-    @cached_property
-    def glitch(self) -> Glitch:
-        ones = sum(1 for r in self.counted_rolls if r == 1)
+    def glitch_for_ones(self, ones: int) -> Glitch:
         if ones * 2 + self.gremlins * 2 > self.dice:
             return Glitch.CRITICAL if self.dice_hits == 0 else Glitch.GLITCH
         else:
             return Glitch.NONE
 
-    @cached_property
+    @property
+    def glitch(self) -> Glitch:
+        return self.glitch_for_ones(self.ones)
+
+    @property
     def hits_limited(self):
         if self.limit > 0:
             return min(self.limit, self.dice_hits)
@@ -48,21 +78,35 @@ class HitsResult:
             return self.dice_hits
 
     # === NEW ROLLS ===
-    def adjust_dice(self, adjustment: int, rng: random.Random = _default_random):
+    def adjust_dice(self, adjustment: int, rng: DiceSource = default_dice_source):
         new_dice_adjustment: int = max(
             self.dice_adjustment + adjustment, -self.original_dice
         )
         # Only roll new dice if the new adjustment exceeds the total number rolled
         new_dice_to_roll = self.original_dice + new_dice_adjustment - len(self.rolls)
-        new_rolls = self.rolls
-        if new_dice_to_roll > 0:
-            additional_rolls = tuple(rng.randint(1, 6) for _ in range(new_dice_to_roll))
-            new_rolls = self.rolls + additional_rolls
-        return replace(self, rolls=new_rolls, dice_adjustment=new_dice_adjustment)
+        new_rolls = rng.extend(self.rolls, new_dice_to_roll)
+        return replace(
+            self,
+            rolls=new_rolls,
+            dice_adjustment=new_dice_adjustment,
+            face_counts=self.shift_face_counts(
+                new_rolls, self.original_dice + new_dice_adjustment
+            ),
+        )
+
+    def shift_face_counts(self, rolls: PackedDice, dice: int) -> tuple[int, ...]:
+        # Face counts for an adjusted pool, only counting the dice that changed
+        return shift_face_counts(
+            self.face_counts, rolls, len(self.counted_rolls), len(rolls[:dice])
+        )
 
     def adjust_limit(self, limit):
         return replace(self, limit=limit)
 
+    def promote[H: HitsResult](self, cls: type[H], **changes: Any) -> H:
+        # Rebuild as an edged result type, keeping the dice and everything counted from them
+        return cls(**asdict(self), **changes)
+
     # === RENDERING ===
     def render_limited_hits(self):
         if self.limit > 0:
@@ -78,46 +122,56 @@ class HitsResult:
         line += self.render_limited_hits()
         return line
 
-    def get_dice_mask(self):
-        return limit_mask(self.limit, self.rolls[: self.dice])
+    @cached_property
+    def dice_mask(self) -> int | None:
+        # Cached in the instance __dict__, which msgspec never encodes
+        return limit_mask(self.limit, self.counted_rolls, self.face_counts)
+
+    def get_dice_mask(self) -> int | None:
+        return self.dice_mask
+
+    def choose_table(self, context: InteractionContext) -> tuple[str, ...]:
+        compiled = context.emoji_manager.packs.compiled
+        return compiled.d6 if self.glitch == Glitch.NONE else compiled.d6_glitch
 
-    def choose_emojis(self, context: InteractionContext):
-        packs = context.emoji_manager.packs
-        chosen_emojis = (
-            packs.d6
-            if (self.glitch == Glitch.NONE)
-            else context.emoji_manager.packs.d6_glitch
+    def render_dice(self, context: InteractionContext) -> str:
+        mask = self.get_dice_mask()
+        key = (
+            type(self),
+            self.rolls,
+            self.original_dice,
+            self.dice,
+            mask,
+            self.glitch,
+            context.compact_dice,
         )
-        limited_emojis = (
-            packs.d6_limited
-            if (self.glitch == Glitch.NONE)
-            else context.emoji_manager.packs.d6_limited_glitch
+        return context.emoji_manager.render_cache.get(
+            key, lambda: self._render_dice(context, mask)
         )
-        return chosen_emojis, limited_emojis
 
-    def render_dice(self, context: InteractionContext) -> str:
-        chosen_emojis, limited_emojis = self.choose_emojis(context)
+    def _render_dice(self, context: InteractionContext, mask) -> str:
+        table = self.choose_table(context)
 
-        adjusted_rolls = self.rolls[: self.dice]
-        baleeted_dice = self.rolls[self.dice : self.original_dice]
-        mask = self.get_dice_mask()
+        if context.compact_dice:
+            line = compact_dice(self.counted_rolls, mask, table)
+            if len(self.rolls) > self.dice:
+                line += "-~~" + face_digits(self.rolls[self.dice :]) + "~~"
+            return line
 
-        dice_emojis = [
-            chosen_emojis[x - 1] if not mask or mask[i] else limited_emojis[x - 1]
-            for (i, x) in enumerate(adjusted_rolls)
-        ]
+        marked = mark_limited(self.rolls[: self.dice], mask)
+        baleeted_dice = self.rolls[self.dice : self.original_dice]
 
         if self.dice_adjustment < 0:
-            line = "".join(dice_emojis)
-            line += "-~~" + "".join(str(x) for x in baleeted_dice) + "~~"
+            line = render_faces(marked, table)
+            line += "-~~" + face_digits(baleeted_dice) + "~~"
         else:
-            line = "".join(dice_emojis[: self.original_dice])
+            line = render_faces(marked[: self.original_dice], table)
 
         if len(self.rolls) > self.original_dice:
             if self.dice_adjustment > 0:
-                line += "+" + "".join(dice_emojis[self.original_dice :])
+                line += "+" + render_faces(marked[self.original_dice :], table)
             if len(self.rolls) > self.dice:
-                line += "-~~" + "".join(str(x) for x in self.rolls[self.dice :]) + "~~"
+                line += "-~~" + face_digits(self.rolls[self.dice :]) + "~~"
         return line
 
     def render_glitch(self, context: InteractionContext) -> str:
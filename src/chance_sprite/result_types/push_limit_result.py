@@ -1,19 +1,16 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from functools import cached_property
-
+from chance_sprite.packed_dice import PackedDice
 from chance_sprite.result_types.hits_result import HitsResult
 from chance_sprite.sprite_context import InteractionContext
-from chance_sprite.sprite_utils import Glitch
+from chance_sprite.sprite_utils import compact_dice, render_faces
 
 
-@dataclass(frozen=True, kw_only=True)
-class PushTheLimitHitsResult(HitsResult):
-    exploded_dice: tuple[tuple[int, ...], ...]
+class PushTheLimitHitsResult(HitsResult, kw_only=True):
+    exploded_dice: tuple[PackedDice, ...]
     rerolled_hits: int
 
-    @cached_property
+    @property
     def hits_limited(self):
         return self.dice_hits + self.rerolled_hits
 
@@ -23,25 +20,20 @@ class PushTheLimitHitsResult(HitsResult):
         else:
             return f" **{self.dice_hits}** hit{'' if self.dice_hits == 1 else 's'}"
 
-    def choose_emojis(self, context: InteractionContext):
-        packs = context.emoji_manager.packs
-        chosen_emojis = (
-            packs.d6
-            if (self.glitch == Glitch.NONE)
-            else context.emoji_manager.packs.d6_glitch
-        )
-        limited_emojis = chosen_emojis
-        return chosen_emojis, limited_emojis
+    def get_dice_mask(self) -> int | None:
+        # Pushing the limit ignores it, so no die is drawn as limited
+        return None
 
     def render_roll(self, context: InteractionContext):
         line = super().render_roll(context)
         packs = context.emoji_manager.packs
-        chosen_emojis = packs.d6_ex
+        table = packs.compiled.d6_ex
         for roll in self.exploded_dice:
-            line += (
-                f"\n`+`{packs.push}"
-                + "".join(chosen_emojis[x - 1] for x in roll)
-                + f" **{sum(1 for r in roll if r in (5, 6))}** hits"
-            )
+            line += f"\n`+`{packs.push}"
+            if context.compact_dice:
+                line += compact_dice(roll, None, table)
+            else:
+                line += render_faces(bytes(roll), table)
+            line += f" **{sum(1 for r in roll if r in (5, 6))}** hits"
         line += f"\n**{self.hits_limited}** Total Hits"
         return line
@@ -1,21 +1,39 @@
 from __future__ import annotations
 
 from functools import cached_property
-import random
-from dataclasses import dataclass, replace
+
+from msgspec.structs import force_setattr, replace
 
 from chance_sprite.result_types.hits_result import HitsResult
 
+from ..dice_source import DiceSource, default_dice_source
+from ..packed_dice import PackedDice
 from ..sprite_context import InteractionContext
-from ..sprite_utils import Glitch, _default_random, limit_mask
-
-
-@dataclass(frozen=True, kw_only=True)
-class SecondChanceHitsResult(HitsResult):
-    rerolled_dice: tuple[int, ...]
+from ..sprite_utils import (
+    add_face_counts,
+    compact_dice,
+    count_faces,
+    face_digits,
+    limit_mask,
+    mark_limited,
+    render_faces,
+    shift_face_counts,
+)
+
+
+class SecondChanceHitsResult(HitsResult, kw_only=True):
+    rerolled_dice: PackedDice
     rerolled_hits: int
+    reroll_face_counts: tuple[int, ...] = ()
 
-    @cached_property
+    def __post_init__(self):
+        super().__post_init__()
+        if not self.reroll_face_counts:
+            force_setattr(
+                self, "reroll_face_counts", count_faces(self.counted_rerolls)
+            )
+
+    @property
     def hits_limited(self):
         total_hits = self.dice_hits + self.rerolled_hits
         if self.limit > 0:
@@ -33,11 +51,18 @@ class SecondChanceHitsResult(HitsResult):
         else:
             return f" **{total_hits}** hit{'' if total_hits == 1 else 's'}"
 
-    def get_dice_mask(self):
-        all_dice_for_mask = (
-            self.rolls[: self.dice] + self.rerolled_dice[: self.dice - self.dice_hits]
+    @property
+    def counted_rerolls(self):
+        return self.rerolled_dice[: self.dice - self.dice_hits]
+
+    @cached_property
+    def dice_mask(self) -> int | None:
+        # One mask over the base dice then the rerolls; the rerolls are the bits above self.dice
+        return limit_mask(
+            self.limit,
+            self.counted_rolls + self.counted_rerolls,
+            add_face_counts(self.face_counts, self.reroll_face_counts),
         )
-        return limit_mask(self.limit, all_dice_for_mask)
 
     def render_roll(self, context: InteractionContext):
         line = super().render_roll(context)
@@ -49,30 +74,36 @@ class SecondChanceHitsResult(HitsResult):
         return line
 
     def render_rerolls(self, context: InteractionContext) -> str:
-        packs = context.emoji_manager.packs
-        chosen_emojis = (
-            packs.d6
-            if (self.glitch == Glitch.NONE)
-            else context.emoji_manager.packs.d6_glitch
+        mask = self.get_dice_mask()
+        key = (
+            "rerolls",
+            self.rerolled_dice,
+            self.rolls[: self.original_dice],
+            self.dice,
+            self.dice_hits,
+            mask,
+            self.glitch,
+            context.compact_dice,
         )
-        limited_emojis = (
-            packs.d6_limited
-            if (self.glitch == Glitch.NONE)
-            else context.emoji_manager.packs.d6_limited_glitch
+        return context.emoji_manager.render_cache.get(
+            key, lambda: self._render_rerolls(context, mask)
         )
 
+    def _render_rerolls(self, context: InteractionContext, mask) -> str:
+        table = self.choose_table(context)
+
         adjusted_rolls = self.rerolled_dice[: self.dice - self.dice_hits]
         baleeted_dice = self.rerolled_dice[self.dice - self.dice_hits :]
-        mask = self.get_dice_mask()
 
-        reroll_mask = mask[self.dice :] if mask else None
+        reroll_mask = mask >> self.dice if mask is not None else None
+
+        if context.compact_dice:
+            line = compact_dice(adjusted_rolls, reroll_mask, table)
+            if baleeted_dice:
+                line += "-~~" + face_digits(baleeted_dice) + "~~"
+            return line
 
-        dice_emojis = [
-            chosen_emojis[x - 1]
-            if not reroll_mask or reroll_mask[i]
-            else limited_emojis[x - 1]
-            for (i, x) in enumerate(adjusted_rolls)
-        ]
+        marked = mark_limited(adjusted_rolls, reroll_mask)
 
         n_original_hits = sum(
             1 for r in self.rolls[: self.original_dice] if r in (5, 6)
@@ -81,42 +112,35 @@ class SecondChanceHitsResult(HitsResult):
         n_current_rerolls = self.dice - self.dice_hits
         post_dice_adjustment = n_current_rerolls - n_original_rerolls
         if post_dice_adjustment < 0:
-            line = "".join(dice_emojis)
-            line += (
-                "-~~"
-                + "".join(str(x) for x in baleeted_dice[:n_original_rerolls])
-                + "~~"
-            )
+            line = render_faces(marked, table)
+            line += "-~~" + face_digits(baleeted_dice[:n_original_rerolls]) + "~~"
         else:
-            line = "".join(dice_emojis[:n_original_rerolls])
+            line = render_faces(marked[:n_original_rerolls], table)
 
         if len(self.rerolled_dice) > n_original_rerolls:
             if post_dice_adjustment > 0:
-                line += "+" + "".join(dice_emojis[n_original_rerolls:n_current_rerolls])
-            if len(self.rerolled_dice) > n_current_rerolls:
-                line += (
-                    "-~~"
-                    + "".join(str(x) for x in baleeted_dice[n_original_rerolls:])
-                    + "~~"
+                line += "+" + render_faces(
+                    marked[n_original_rerolls:n_current_rerolls], table
                 )
+            if len(self.rerolled_dice) > n_current_rerolls:
+                line += "-~~" + face_digits(baleeted_dice[n_original_rerolls:]) + "~~"
         return line
 
-    def adjust_dice(self, adjustment: int, rng: random.Random = _default_random):
+    def adjust_dice(self, adjustment: int, rng: DiceSource = default_dice_source):
         replacement_base = super().adjust_dice(adjustment, rng)
-        added_dice_amount = (
-            replacement_base.dice - replacement_base.dice_hits - len(self.rerolled_dice)
+        new_reroll_count = replacement_base.dice - replacement_base.dice_hits
+        new_rerolled_dice = rng.extend(
+            self.rerolled_dice, new_reroll_count - len(self.rerolled_dice)
         )
-        added_rerolls = tuple(rng.randint(1, 6) for _ in range(added_dice_amount))
-        new_rerolled_dice = self.rerolled_dice + added_rerolls
-        new_rerolled_hits = sum(
-            1
-            for r in new_rerolled_dice[
-                0 : replacement_base.dice - replacement_base.dice_hits
-            ]
-            if r in (5, 6)
+        reroll_counts = shift_face_counts(
+            self.reroll_face_counts,
+            new_rerolled_dice,
+            len(self.counted_rerolls),
+            len(new_rerolled_dice[:new_reroll_count]),
         )
         return replace(
             replacement_base,
             rerolled_dice=new_rerolled_dice,
-            rerolled_hits=new_rerolled_hits,
+            rerolled_hits=reroll_counts[4] + reroll_counts[5],
+            reroll_face_counts=reroll_counts,
         )
@@ -1,15 +1,19 @@
 # basic.py
 from __future__ import annotations
 
-from dataclasses import dataclass, field, replace
+from collections import Counter
 from datetime import datetime, timedelta, timezone
 from typing import Annotated, Optional, override
 
-from boltons.cacheutils import cachedproperty
-from discord import ui
+from discord import Interaction, ui
 from discord.app_commands import Range
+from msgspec import Struct, field
+from msgspec.structs import replace
 
-from chance_sprite.result_types import HitsResult
+from chance_sprite.dice_source import default_dice_source
+from chance_sprite.packed_dice import PackedDice
+from chance_sprite.probability.extended import ExtendedOdds, extended_odds
+from chance_sprite.result_types import AnyHitsResult, HitsResult
 from chance_sprite.roller import (
     roll_exploding,
     roll_hits,
@@ -21,11 +25,16 @@ from ..message_cache import message_codec
 from ..message_cache.message_record import MessageRecord
 from ..message_cache.roll_record_base import ResistableRoll, RollRecordBase
 from ..rollui.base_menu_view import BaseMenuView
-from ..rollui.base_roll_view import BaseRollView
+from ..rollui.base_roll_view import (
+    CROSSOUT_SUB,
+    MAX_CONTENT_LENGTH,
+    BaseRollView,
+    BaseView,
+)
 from ..rollui.roll_accessor import RollAccessor
 from ..rollui.roll_view_persist import EdgeMenuButton, ResistButton
 from ..sprite_context import InteractionContext
-from ..sprite_utils import color_by_net_hits, humanize_timedelta, plural_s
+from ..sprite_utils import Glitch, color_by_net_hits, humanize_timedelta, plural_s
 
 
 class ThresholdView(BaseRollView):
@@ -66,11 +75,10 @@ class ThresholdView(BaseRollView):
 
 @message_codec.alias("SimpleRoll")
 @message_codec.alias("ThresholdResult")
-@dataclass(frozen=True)
-class ThresholdRoll(ResistableRoll):
-    result: HitsResult
+class ThresholdRoll(ResistableRoll, kw_only=True):
+    result: AnyHitsResult
     threshold: int = 0
-    resistance_rolls: dict[int, HitsResult] = field(default_factory=dict)
+    resistance_rolls: dict[int, AnyHitsResult] = field(default_factory=dict)
 
     @property
     def succeeded(self) -> Optional[bool]:
@@ -171,6 +179,172 @@ def roll_simple(
     return ThresholdRoll(result=roll, threshold=threshold, resistable=resistable)
 
 
+class BatchRollView(BaseRollView):
+    def __init__(self, roll_result: BatchRoll, label: str, context: InteractionContext):
+        results = roll_result.results
+        pool = f"**{roll_result.count}** × `{roll_result.dice}d6`"
+        if roll_result.limit:
+            pool += f" limit {roll_result.limit}"
+        if roll_result.threshold:
+            pool += f" vs ({roll_result.threshold})"
+        successes = roll_result.successes(results)
+        # Without a threshold there's no outcome to colour by
+        net = 2 * successes - len(results) if roll_result.threshold > 0 else 0
+        super().__init__(f"{label}\n{pool}", color_by_net_hits(net), context)
+
+        histogram = Counter(r.hits_limited for r in results)
+        rows = [
+            f"`{hits:>2}` {'█' * histogram[hits]} {histogram[hits]}"
+            for hits in range(max(histogram, default=0) + 1)
+        ]
+        self.add_text("**Hits:**\n" + "\n".join(rows))
+
+        outcome: list[str] = []
+        if roll_result.threshold > 0:
+            outcome.append(f"**{successes}**/{len(results)} succeeded")
+        glitches = Counter(r.glitch for r in results)
+        (glitched, critical) = (glitches[Glitch.GLITCH], glitches[Glitch.CRITICAL])
+        if glitched or critical:
+            outcome.append(
+                f"{glitched} glitch{'' if glitched == 1 else 'es'}, {critical} critical"
+            )
+        if outcome:
+            self.add_separator()
+            self.add_text("\n".join(outcome))
+
+        self.add_buttons(EdgeMenuButton())
+
+
+class BatchRowsView(BaseView):
+    def __init__(self, roll_result: BatchRoll, context: InteractionContext):
+        super().__init__(timeout=None)
+        rows = roll_result.render_rows(context)
+        if _rows_length(rows) > MAX_CONTENT_LENGTH:
+            context.compact_dice = True
+            rows = roll_result.render_rows(context)
+        if _rows_length(rows) > MAX_CONTENT_LENGTH:
+            context.emoji_manager = context.lite_emojis
+            rows = roll_result.render_rows(context)
+        txt = _fit_rows(rows, MAX_CONTENT_LENGTH)
+        self.add_item(ui.Container(ui.TextDisplay(txt)))
+
+
+def _rows_length(rows: list[str]) -> int:
+    return sum(len(row) for row in rows) + max(len(rows) - 1, 0)
+
+
+def _fit_rows(rows: list[str], budget: int) -> str:
+    # Drop whole rows from the end rather than cutting one in half
+    if _rows_length(rows) <= budget:
+        return "\n".join(rows)
+    kept = list(rows)
+    while kept:
+        kept.pop()
+        more = f"+{len(rows) - len(kept)} more"
+        if _rows_length(kept) + len(more) + 1 <= budget:
+            return "\n".join([*kept, more])
+    return f"+{len(rows)} more"
+
+
+class BatchRoll(RollRecordBase, kw_only=True):
+    """
+    The same test rolled for many pools at once. Every pool is drawn in one
+    go and stored back to back in `rolls`, so the record stays one blob.
+    """
+
+    dice: int
+    count: int
+    rolls: PackedDice
+    threshold: int = 0
+    limit: int = 0
+    gremlins: int = 0
+
+    @property
+    def results(self) -> list[HitsResult]:
+        dice = self.dice
+        return [
+            HitsResult(
+                original_dice=dice,
+                rolls=self.rolls[i * dice : (i + 1) * dice],
+                limit=self.limit,
+                gremlins=self.gremlins,
+            )
+            for i in range(self.count)
+        ]
+
+    def successes(self, results: list[HitsResult]) -> int:
+        if self.threshold <= 0:
+            return 0
+        return sum(1 for r in results if r.hits_limited >= self.threshold)
+
+    def render_rows(self, context: InteractionContext) -> list[str]:
+        lines: list[str] = []
+        for i, result in enumerate(self.results, 1):
+            line = f"`#{i:>2}` {result.render_roll_with_glitch(context)}"
+            if self.threshold > 0:
+                line += " ✅" if result.hits_limited >= self.threshold else " ❌"
+            lines.append(CROSSOUT_SUB.sub("", line))
+        return lines
+
+    def build_view(self, label: str, context: InteractionContext) -> ui.LayoutView:
+        return BatchRollView(self, label, context)
+
+    @classmethod
+    async def send_menu(
+        cls, record: MessageRecord[BatchRoll], context: InteractionContext
+    ):
+        menu = BaseMenuView(record_id=record.message_id)
+        menu.add_text(f"Batch of {record.roll_result.count}:")
+
+        async def show_rows(interaction: Interaction):
+            rows_context = InteractionContext(interaction)
+            current = await rows_context.get_cached_record(record.message_id)
+            await interaction.response.send_message(
+                view=BatchRowsView((current or record).roll_result, rows_context),
+                ephemeral=True,
+            )
+
+        menu.create_button("Show rolls", callback=show_rows)
+
+        @menu.modal_button(
+            "±TH",
+            title="Adjust Threshold",
+            body="Enter the new threshold, or 0 for none.",
+            fields=[LabeledNumberField("TH", 0, 99, placeholder="e.g. 3")],
+        )
+        def adjust_threshold_button(
+            roll: BatchRoll, context: InteractionContext, threshold: int
+        ) -> BatchRoll:
+            return replace(roll, threshold=threshold)
+
+        await context.send_as_followup(menu)
+
+
+@roll_command(desc="Roll the same test for many pools at once, e.g. a group of NPCs.")
+def roll_batch(
+    *,
+    dice: Annotated[Range[int, 1, 99], Desc("Dice in each pool (1-99).")],
+    count: Annotated[Range[int, 1, 50], Desc("Number of pools to roll (1-50).")],
+    threshold: Annotated[Range[int, 0, 99], Desc("Threshold to reach (0 if none).")],
+    limit: Annotated[
+        Range[int, 0, 99],
+        Desc("The limit associated with each roll (0 if none)."),
+    ] = 0,
+    gremlins: Annotated[
+        Range[int, 0, 4],
+        Desc("Reduces 1s needed to glitch. Gremlins, Social Stress, etc."),
+    ] = 0,
+) -> BatchRoll:
+    return BatchRoll(
+        dice=dice,
+        count=count,
+        rolls=default_dice_source.roll(dice * count),
+        threshold=threshold,
+        limit=limit,
+        gremlins=gremlins,
+    )
+
+
 class ExtendedRollView(BaseRollView):
     def __init__(
         self, roll_result: ExtendedRoll, label: str, context: InteractionContext
@@ -198,18 +372,23 @@ class ExtendedRollView(BaseRollView):
         self.add_text(
             f"Result: **{'Succeeded' if roll_result.succeeded else 'Failed'}** after **{roll_result.iters_used}** interval{plural_s(roll_result.iters_used)} with {roll_result.final_hits} total hit{plural_s(roll_result.final_hits)} (**{roll_result.final_hits - roll_result.threshold}** net)"
         )
+        odds = roll_result.odds
+        expected = ""
+        if odds.success_chance > 0:
+            expected = f", taking **{odds.expected_intervals_to_success:.1f}** interval(s) on average"
+        self.add_text(f"Odds: {odds.success_chance:.0%} to succeed{expected}")
 
 
-@dataclass(frozen=True)
-class ExtendedIteration:
+class ExtendedIteration(
+    Struct, frozen=True, kw_only=True, tag_field="type", tag=True
+):
     n: int
-    roll: HitsResult
+    roll: AnyHitsResult
     cumulative_hits: int
 
 
 @message_codec.alias("ExtendedResult")
-@dataclass(frozen=True)
-class ExtendedRoll(RollRecordBase):
+class ExtendedRoll(RollRecordBase, kw_only=True):
     start_dice: int
     threshold: int
     max_iters: int
@@ -221,17 +400,23 @@ class ExtendedRoll(RollRecordBase):
     def succeeded(self):
         return self.final_hits >= self.threshold
 
-    @cachedproperty
+    @property
     def final_hits(self):
         if self.iterations:
             return self.iterations[-1].cumulative_hits
         else:
             return 0
 
-    @cachedproperty
+    @property
     def iters_used(self):
         return len(self.iterations)
 
+    @property
+    def odds(self) -> ExtendedOdds:
+        return extended_odds(
+            self.start_dice, self.threshold, self.max_iters, self.limit
+        )
+
     def build_view(self, label: str, context: InteractionContext) -> ui.LayoutView:
         return ExtendedRollView(self, label, context)
 
@@ -277,7 +462,7 @@ def roll_extended(
         max_iters=max_iters,
         iterations=tuple(iterations),
         limit=limit,
-        gremlins=gremlins,
+        gremlins=gremlins or 0,
     )
 
 
@@ -310,10 +495,9 @@ class OpposedRollView(BaseRollView):
 
 
 @message_codec.alias("OpposedResult")
-@dataclass(frozen=True)
-class OpposedRoll(RollRecordBase):
-    initiator: HitsResult
-    defender: HitsResult
+class OpposedRoll(RollRecordBase, kw_only=True):
+    initiator: AnyHitsResult
+    defender: AnyHitsResult
 
     @property
     def net_hits(self) -> int:
@@ -422,10 +606,9 @@ class AvailabilityRollView(BaseRollView):
 
 
 @message_codec.alias("OpposedResult")
-@dataclass(frozen=True)
-class AvailabilityRoll(RollRecordBase):
-    initiator: HitsResult
-    defender: HitsResult
+class AvailabilityRoll(RollRecordBase, kw_only=True):
+    initiator: AnyHitsResult
+    defender: AnyHitsResult
     cost: int | None
     timestamp: int | None = None  # TODO
 
@@ -2,17 +2,18 @@
 from __future__ import annotations
 
 import logging
-from dataclasses import dataclass, field, replace
 from typing import Annotated, Optional
 
 from discord import ui
 from discord.app_commands import Range
+from msgspec import field
+from msgspec.structs import replace
 
 from chance_sprite.fungen import Desc, roll_command
 from chance_sprite.message_cache import message_codec
 from chance_sprite.message_cache.message_record import MessageRecord
 from chance_sprite.message_cache.roll_record_base import ResistableRoll, RollRecordBase
-from chance_sprite.result_types import HitsResult
+from chance_sprite.result_types import AnyHitsResult
 from chance_sprite.roller import roll_exploding, roll_hits
 from chance_sprite.rollui.base_menu_view import BaseMenuView
 from chance_sprite.rollui.base_roll_view import BaseRollView
@@ -25,16 +26,15 @@ from chance_sprite.sprite_utils import Glitch, sign_int
 log = logging.getLogger(__name__)
 
 
-@dataclass(frozen=True)
-class AlchemyCreateRoll(RollRecordBase):
+class AlchemyCreateRoll(RollRecordBase, kw_only=True):
     # Inputs
     force: int
     drain_value: int
 
     # Rolls
-    cast: HitsResult
-    resist: HitsResult
-    drain: HitsResult
+    cast: AnyHitsResult
+    resist: AnyHitsResult
+    drain: AnyHitsResult
 
     @property
     def drain_succeeded(self) -> Optional[bool]:
@@ -144,15 +144,14 @@ def roll_alchemy_create(
 
 
 @message_codec.alias("ResistedAlchemyRoll")
-@dataclass(frozen=True)
-class AlchemyActivateRoll(ResistableRoll):
+class AlchemyActivateRoll(ResistableRoll, kw_only=True):
     # Inputs
     force: int
     potency: int
     practiced: int
     # Rolls
-    cast: HitsResult
-    resistance_rolls: dict[int, HitsResult] = field(default_factory=dict)
+    cast: AnyHitsResult
+    resistance_rolls: dict[int, AnyHitsResult] = field(default_factory=dict)
 
     def build_view(self, label: str, context: InteractionContext) -> ui.LayoutView:
         return AlchemyActivateRollView(self, label, context)
@@ -224,17 +223,16 @@ def roll_alchemy_activate(
 
 
 @message_codec.alias("BindResult")
-@dataclass(frozen=True)
-class BindingRoll(RollRecordBase):
+class BindingRoll(RollRecordBase, kw_only=True):
     # Inputs
     force: int
     services_in: int
     drain_adjust: int
 
     # Rolls
-    bind: HitsResult
-    resist: HitsResult
-    drain: HitsResult
+    bind: AnyHitsResult
+    resist: AnyHitsResult
+    drain: AnyHitsResult
 
     @property
     def net_hits(self) -> int:
@@ -368,17 +366,16 @@ def roll_binding(
 
 @message_codec.alias("ResistedSpellRoll")
 @message_codec.alias("SpellcastResult")
-@dataclass(frozen=True)
-class SpellRoll(ResistableRoll):
+class SpellRoll(ResistableRoll, kw_only=True):
     # Inputs
     force: int
     drain_value: int
 
     # Rolls
-    cast: HitsResult
-    drain: HitsResult
-    opposition: HitsResult | None = None
-    resistance_rolls: dict[int, HitsResult] = field(default_factory=dict)
+    cast: AnyHitsResult
+    drain: AnyHitsResult
+    opposition: AnyHitsResult | None = None
+    resistance_rolls: dict[int, AnyHitsResult] = field(default_factory=dict)
 
     @property
     def drain_succeeded(self) -> Optional[bool]:
@@ -541,16 +538,15 @@ def roll_spell(
 
 
 @message_codec.alias("SummonResult")
-@dataclass(frozen=True)
-class SummonRoll(RollRecordBase):
+class SummonRoll(RollRecordBase, kw_only=True):
     # Inputs
     force: int
     drain_adjust: int  # additive override applied to DV after spirit hits
 
     # Rolls
-    summon: HitsResult  # limited by limit/force via RollResult.limit
-    resist: HitsResult  # spirit resistance; dice = force
-    drain: HitsResult  # drain resistance roll
+    summon: AnyHitsResult  # limited by limit/force via RollResult.limit
+    resist: AnyHitsResult  # spirit resistance; dice = force
+    drain: AnyHitsResult  # drain resistance roll
 
     @property
     def net_hits(self) -> int:
@@ -45,34 +45,48 @@ class StartingCashSpec:
     color: int  # hex
 
 
+_STARTING_CASH_SPECS = {
+    "STREET": StartingCashSpec("Street", 1, 20, 0xFFB3BA),  # pastel red
+    "SQUATTER": StartingCashSpec("Squatter", 2, 40, 0xFFDFBA),  # pastel orange
+    "LOW": StartingCashSpec("Low", 3, 60, 0xFFFFBA),  # pastel yellow
+    "MIDDLE": StartingCashSpec("Middle", 4, 100, 0xBAFFC9),  # pastel green
+    "HIGH": StartingCashSpec("High", 5, 500, 0xBAE1FF),  # pastel blue
+    "LUXURY": StartingCashSpec("Luxury", 6, 1000, 0xE0BBE4),  # pastel purple
+}
+
+
 class LifestyleStartingCash(Enum):
-    STREET = StartingCashSpec("Street", 1, 20, 0xFFB3BA)  # pastel red
-    SQUATTER = StartingCashSpec("Squatter", 2, 40, 0xFFDFBA)  # pastel orange
-    LOW = StartingCashSpec("Low", 3, 60, 0xFFFFBA)  # pastel yellow
-    MIDDLE = StartingCashSpec("Middle", 4, 100, 0xBAFFC9)  # pastel green
-    HIGH = StartingCashSpec("High", 5, 500, 0xBAE1FF)  # pastel blue
-    LUXURY = StartingCashSpec("Luxury", 6, 1000, 0xE0BBE4)  # pastel purple
+    # Stored by name, the spec for each tier is looked up from its name
+    STREET = "STREET"
+    SQUATTER = "SQUATTER"
+    LOW = "LOW"
+    MIDDLE = "MIDDLE"
+    HIGH = "HIGH"
+    LUXURY = "LUXURY"
+
+    @property
+    def spec(self) -> StartingCashSpec:
+        return _STARTING_CASH_SPECS[self.value]
 
     @property
     def label(self) -> str:
-        return self.value.label
+        return self.spec.label
 
     @property
     def dice(self) -> int:
-        return self.value.dice
+        return self.spec.dice
 
     @property
     def mult(self) -> int:
-        return self.value.mult
+        return self.spec.mult
 
     @property
     def color(self) -> int:
-        return self.value.color
+        return self.spec.color
 
 
 @message_codec.alias("StartingCashResult")
-@dataclass(frozen=True)
-class StartingCashRoll(RollRecordBase):
+class StartingCashRoll(RollRecordBase, kw_only=True):
     result: AdditiveResult
     lifestyle: LifestyleStartingCash
 
@@ -119,8 +133,7 @@ class InitiativeRollView(BaseRollView):
 
 
 @message_codec.alias("StartingCashResult")
-@dataclass(frozen=True)
-class InitiativeRoll(RollRecordBase):
+class InitiativeRoll(RollRecordBase, kw_only=True):
     result: AdditiveResult
     base: int
 
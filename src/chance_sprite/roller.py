@@ -1,9 +1,6 @@
 from __future__ import annotations
 
-import random
-
-from msgspec import to_builtins
-
+from chance_sprite.dice_source import DiceSource, default_dice_source
 from chance_sprite.result_types import (
     HitsResult,
     BreakTheLimitHitsResult,
@@ -13,17 +10,15 @@ from chance_sprite.result_types import (
     AdditiveResult,
 )
 
-_default_random = random.Random()
-
 
 def roll_hits(
     dice: int,
     *,
     limit: int = 0,
     gremlins: int = 0,
-    rng: random.Random = _default_random,
+    rng: DiceSource = default_dice_source,
 ) -> HitsResult:
-    rolls = tuple(rng.randint(1, 6) for _ in range(dice))
+    rolls = rng.roll(dice)
     return HitsResult(original_dice=dice, rolls=rolls, limit=limit, gremlins=gremlins)
 
 
@@ -32,59 +27,57 @@ def roll_exploding(
     *,
     limit: int = 0,
     gremlins: int = 0,
-    rng: random.Random = _default_random,
+    rng: DiceSource = default_dice_source,
 ) -> BreakTheLimitHitsResult:
-    rolls = tuple(rng.randint(1, 6) for _ in range(dice))
+    rolls = rng.roll(dice)
     exploded_dice = []
     sixes = sum(1 for r in rolls if r == 6)
     while True:
-        rerolls = tuple(rng.randint(1, 6) for _ in range(sixes))
+        rerolls = rng.roll(sixes)
         exploded_dice.append(rerolls)
         sixes = sum(1 for r in rerolls if r == 6)
         if sixes == 0:
             break
     return BreakTheLimitHitsResult(
         original_dice=dice,
-        rolls=tuple(rolls),
+        rolls=rolls,
         limit=limit,
         gremlins=gremlins,
         exploded_dice=tuple(exploded_dice),
     )
 
 
-def second_chance(hits_result: HitsResult, rng: random.Random = _default_random):
-    rerolls = tuple(
-        rng.randint(1, 6) for _ in range(hits_result.dice - hits_result.dice_hits)
-    )
+def second_chance(hits_result: HitsResult, rng: DiceSource = default_dice_source):
+    rerolls = rng.roll(hits_result.dice - hits_result.dice_hits)
     new_hits = sum(1 for r in rerolls if r in (5, 6))
-    return SecondChanceHitsResult(
-        **to_builtins(hits_result), rerolled_dice=rerolls, rerolled_hits=new_hits
+    return hits_result.promote(
+        SecondChanceHitsResult, rerolled_dice=rerolls, rerolled_hits=new_hits
     )
 
 
-def push_the_limit(hits_result, edge: int, rng: random.Random = _default_random):
+def push_the_limit(hits_result, edge: int, rng: DiceSource = default_dice_source):
     explosion_iterations = []
     sixes = edge
     total_hits = 0
     while True:
-        rerolls = tuple(rng.randint(1, 6) for _ in range(sixes))
+        rerolls = rng.roll(sixes)
         explosion_iterations.append(rerolls)
         sixes = sum(1 for r in rerolls if r == 6)
         total_hits += sum(1 for r in rerolls if r in (5, 6))
         if sixes == 0:
             break
 
-    return PushTheLimitHitsResult(
-        **to_builtins(hits_result),
+    return hits_result.promote(
+        PushTheLimitHitsResult,
         exploded_dice=tuple(explosion_iterations),
         rerolled_hits=total_hits,
     )
 
 
 def close_call(hits_result: HitsResult):
-    return CloseCallResult(**to_builtins(hits_result))
+    return hits_result.promote(CloseCallResult)
 
 
-def additive_roll(dice: int, *, rng: random.Random = _default_random) -> AdditiveResult:
-    rolls = tuple(rng.randint(1, 6) for _ in range(dice))
+def additive_roll(dice: int, *, rng: DiceSource = default_dice_source) -> AdditiveResult:
+    rolls = rng.roll(dice)
     return AdditiveResult(dice=dice, rolls=rolls)
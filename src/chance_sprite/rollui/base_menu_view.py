@@ -1,9 +1,10 @@
-from dataclasses import replace
 from typing import Callable
 
 from discord import ButtonStyle, Interaction, ui
+from msgspec.structs import replace
 
 from chance_sprite.message_cache.roll_record_base import RollRecordBase
+from chance_sprite.probability.edge import push_the_limit_gain, second_chance_gain
 from chance_sprite.result_types.hits_result import HitsResult
 from chance_sprite.roller import close_call, push_the_limit, second_chance
 from chance_sprite.rollui.base_roll_view import BaseView
@@ -94,8 +95,22 @@ class BaseMenuView[R: RollRecordBase](BaseView):
         def disable_all():
             [disable(button) for button in edge_buttons]
 
+        # Expected change in hits for each option
+        reroll_gain = second_chance_gain(
+            initial_result.dice_hits,
+            initial_result.dice - initial_result.dice_hits,
+            initial_result.limit,
+        )
+        lifted_hits = initial_result.dice_hits - initial_result.hits_limited
+        # Pushing leaves the pool's dice alone and adds Edge exploding dice, so
+        # the pool only counts through the limit it lifts (shown separately)
+        per_edge = push_the_limit_gain(0, 0, 1)
+        push_label = f"+{per_edge:.1f}/Edge"
+        if lifted_hits > 0:
+            push_label = f"+{lifted_hits} {push_label}"
+
         @self.modal_button(
-            "♻️",
+            f"♻️ +{reroll_gain:.1f}",
             title="2nd Chance",
             body="Use Edge to reroll failures?",
             fields=[],
@@ -107,9 +122,10 @@ class BaseMenuView[R: RollRecordBase](BaseView):
         edge_buttons.append(second_chance_button)
 
         @self.modal_button(
-            "⚡",
+            f"⚡ {push_label}",
             title="Push Limit",
-            body="Enter your edge score to break the limit with exploding dice.",
+            body="Enter your edge score to break the limit with exploding dice. "
+            f"Each Edge adds {per_edge:.1f} hits on average.",
             fields=[LabeledNumberField("Edge", 0, 12)],
         )
         def push_limit_button(roll: R, context: InteractionContext, dice: int):
@@ -119,7 +135,7 @@ class BaseMenuView[R: RollRecordBase](BaseView):
         edge_buttons.append(push_limit_button)
 
         @self.modal_button(
-            "🛡️",
+            close_call_label(initial_result.glitch),
             title="Close Call",
             body="Use Edge to mitigate a glitch?",
             fields=[],
@@ -168,3 +184,12 @@ class BaseMenuView[R: RollRecordBase](BaseView):
         self.add_edge_buttons(record, accessor)
         self.add_adjust_dice_button(record, accessor)
         self.add_adjust_limit_button(record, accessor)
+
+
+def close_call_label(glitch: Glitch) -> str:
+    # Close Call changes no hits; it knocks the glitch already rolled down a step
+    if glitch == Glitch.CRITICAL:
+        return "🛡️ Crit→Glitch"
+    if glitch == Glitch.GLITCH:
+        return "🛡️ -Glitch"
+    return "🛡️"
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import re
+from typing import TYPE_CHECKING, Any, Callable, Self
 
-from discord import File, UnfurledMediaItem, ui
+from discord import File, MediaGalleryItem, UnfurledMediaItem, ui
 
-from chance_sprite.sprite_context import InteractionContext
+if TYPE_CHECKING:
+    from chance_sprite.sprite_context import InteractionContext
 
 
 class BaseView(ui.LayoutView):
@@ -13,9 +15,16 @@ class BaseView(ui.LayoutView):
 
 
 CROSSOUT_SUB = re.compile(r"~~~~")
+MAX_CONTENT_LENGTH = 4000
 
 
 class BaseRollView(BaseView):
+    """
+    Roll views are planned first and only turned into ui components by
+    materialize(), so content_length() can be checked (and the emoji pack
+    switched) before anything is allocated.
+    """
+
     def __init__(
         self,
         label: str,
@@ -24,24 +33,16 @@ class BaseRollView(BaseView):
     ) -> None:
         super().__init__(timeout=None)
 
-        roll_record = context.get_roll_record()
-        owner_id = roll_record.owner_id if roll_record else 0
-        (username, avatar) = context.get_avatar(owner_id)
-
-        if not label.strip():
-            label = "(no label)"
-        header_txt = ui.TextDisplay(f"### {username}\n{label.strip()}")
-        header_section = ui.Section(
-            header_txt,
-            accessory=ui.Thumbnail(avatar),
-        )
-        self.container = ui.Container(
-            header_section, ui.Separator(), accent_color=accent_color
-        )
-        self.add_item(self.container)
+        self.accent_color = accent_color
+        self.header = context.roll_header(label.strip() or "(no label)")
+        self.plan: list[tuple[Any, ...]] = [("separator",)]
+        self.planned_length = len(self.header[0])
+        self.container: ui.Container | None = None
 
     def add_text(self, txt: str):
-        self.container.add_item(ui.TextDisplay(CROSSOUT_SUB.sub("", txt)))
+        txt = CROSSOUT_SUB.sub("", txt)
+        self.plan.append(("text", txt))
+        self.planned_length += len(txt)
 
     def add_long_text(self, blocks: list[str]):
         # Split into chunks
@@ -53,17 +54,66 @@ class BaseRollView(BaseView):
             self.add_text(chunk)
 
     def add_separator(self):
-        self.container.add_item(ui.Separator())
+        self.plan.append(("separator",))
 
     def add_section(self, txt: str, icon: str | File | UnfurledMediaItem):
-        section = ui.Section(
-            ui.TextDisplay(txt),
-            accessory=ui.Thumbnail(icon),
-        )
-        self.container.add_item(section)
+        self.plan.append(("section", txt, icon))
+        self.planned_length += len(txt)
 
     def add_buttons(self, *buttons: ui.Button):
-        if not isinstance(self.container.children[-1], ui.Separator):
+        if self.plan[-1][0] != "separator":
             self.add_separator()
-        button_row = ui.ActionRow(*buttons)
-        self.container.add_item(button_row)
+        self.plan.append(("buttons", buttons))
+
+    def add_image(self, url: str):
+        # Images go above the trailing buttons, if there are any
+        index = len(self.plan)
+        if self.plan[-1][0] == "buttons":
+            index -= 2 if self.plan[-2][0] == "separator" else 1
+        self.plan.insert(index, ("image", url))
+
+    def rewrite_text(self, rewrite: Callable[[str], str]):
+        """Apply `rewrite` to every planned text, including section texts."""
+        self.planned_length = len(self.header[0])
+        for i, (kind, *args) in enumerate(self.plan):
+            if kind in ("text", "section"):
+                txt = rewrite(args[0])
+                self.plan[i] = (kind, txt, *args[1:])
+                self.planned_length += len(txt)
+
+    def remaining_length(self, budget: int = MAX_CONTENT_LENGTH) -> int:
+        return budget - self.planned_length
+
+    def content_length(self) -> int:
+        if self.container is None:
+            return self.planned_length
+        return super().content_length()
+
+    def materialize(self) -> Self:
+        if self.container is not None:
+            return self
+        (header_txt, avatar) = self.header
+        self.container = ui.Container(
+            ui.Section(ui.TextDisplay(header_txt), accessory=ui.Thumbnail(avatar)),
+            accent_color=self.accent_color,
+        )
+        for kind, *args in self.plan:
+            if kind == "text":
+                self.container.add_item(ui.TextDisplay(args[0]))
+            elif kind == "separator":
+                self.container.add_item(ui.Separator())
+            elif kind == "section":
+                (txt, icon) = args
+                self.container.add_item(
+                    ui.Section(ui.TextDisplay(txt), accessory=ui.Thumbnail(icon))
+                )
+            elif kind == "image":
+                self.container.add_item(ui.MediaGallery(MediaGalleryItem(args[0])))
+            elif kind == "buttons":
+                self.container.add_item(ui.ActionRow(*args[0]))
+        self.add_item(self.container)
+        return self
+
+    def to_components(self):
+        self.materialize()
+        return super().to_components()
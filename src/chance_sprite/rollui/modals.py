@@ -47,14 +47,20 @@ class BuiltModal(ui.Modal):
 
         context = InteractionContext(interaction)
 
-        record = context.get_cached_record(self._origin_id)
+        record = await context.get_cached_record(self._origin_id)
+        if record is None:
+            await interaction.response.send_message(
+                "Couldn't find that roll in the bot's database. Could be a bug, or maybe it expired?",
+                ephemeral=True,
+            )
+            return
 
         new_record = self._transform(record.roll_result, context, *values)
         try:
             await context.update_original(record, new_record)
         except Exception:
             if self._on_fail:
-                await self._on_fail(record, context, *values)
+                await self._on_fail(record.roll_result, context, *values)
 
         if self._view:
             await context.update_menu(self._view)
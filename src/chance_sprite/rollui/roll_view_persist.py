@@ -40,7 +40,7 @@ class EdgeMenuButton(ui.Button):
             )
             return
 
-        message_record = context.client.message_store[msg.id]
+        message_record = await context.get_cached_record(msg.id)
         if message_record is None:
             await interaction.followup.send(
                 "Couldn't find that roll in the bot's database. Could be a bug, or maybe it expired?",
@@ -83,7 +83,7 @@ class ResistButton(ui.Button):
             )
             return
 
-        message_record = context.client.message_store[msg.id]
+        message_record = await context.get_cached_record(msg.id)
         if message_record is None:
             await interaction.response.send_message(
                 "Couldn't find that roll in the bot's database. Could be a bug, or maybe it expired?",
@@ -109,8 +109,7 @@ class ResistButton(ui.Button):
                 limit: int,
                 pre_edge: bool,
             ):
-                record = context.get_cached_record(msg.id)
-                if len(record.roll_result.already_resisted()) < 10:
+                if len(roll.already_resisted()) < 10:
                     return roll.resist(context, dice, limit=limit, pre_edge=pre_edge)
                 else:
                     raise ValueError("Too many resistors!")
@@ -124,13 +123,12 @@ class ResistButton(ui.Button):
             ):
                 from chance_sprite.roll_types.basic import roll_simple
 
-                record = context.get_cached_record(msg.id)
                 threshold = roll.resistance_target()
                 threshold_roll = roll_simple(
                     dice=dice, threshold=threshold, limit=limit, pre_edge=pre_edge
                 )
                 await context.transmit_result(
-                    f"Resisting {record.label} ({threshold})", threshold_roll
+                    f"Resisting {message_record.label} ({threshold})", threshold_roll
                 )
 
             modal = BuiltModal(
@@ -2,21 +2,33 @@ from __future__ import annotations
 
 import logging
 import sys
-from dataclasses import replace
 from datetime import datetime, timedelta
+from io import BytesIO
 from typing import TYPE_CHECKING
 
 from discord import (
     DMChannel,
+    File,
     Interaction,
     InteractionCallbackResponse,
     InteractionMessage,
 )
+from msgspec.structs import replace
 
+from chance_sprite.emojis.dice_image import (
+    IMAGE_FILENAME,
+    extract_dice_rows,
+    render_dice_rows_async,
+)
 from chance_sprite.message_cache.message_record import MessageRecord
-from chance_sprite.message_cache.roll_record_base import RollRecordBase
+from chance_sprite.message_cache.roll_record_base import (
+    ResistableRoll,
+    RollRecordBase,
+)
 from chance_sprite.message_cache.webhook_handle import WebhookHandle
 
+from chance_sprite.rollui.base_roll_view import MAX_CONTENT_LENGTH, BaseRollView
+
 if TYPE_CHECKING:
     from chance_sprite.rollui.base_menu_view import BaseMenuView
 
@@ -24,6 +36,9 @@ from chance_sprite.sprite_utils import epoch_seconds, has_get_partial_message
 
 log = logging.getLogger(__name__)
 
+# Shown for anyone whose avatar wasn't loaded before the view was built
+UNKNOWN_AVATAR = ("Unknown", "https://cdn.discordapp.com/embed/avatars/0.png")
+
 
 class InteractionContext:
     def __init__(self, interaction: Interaction):
@@ -34,21 +49,27 @@ class InteractionContext:
         self.client = interaction.client
         self.emoji_manager = interaction.client.emoji_manager
         self.lite_emojis = interaction.client.lite_emojis
+        # Set by build_view when a roll is too long to show die by die
+        self.compact_dice = False
+        # Whose roll build_view is drawing, as passed in by its caller
+        self.owner_id = 0
+        # Lookups are kept for the life of the interaction, so the several
+        # builds of one view (full, compact, image, lite) share them
+        self._avatars: dict[tuple[int, int], tuple[str, str]] = {}
+        self._headers: dict[tuple[int, int, str], tuple[str, str]] = {}
 
-        self.client.user_avatar_store.update_avatar(
-            self.interaction.user.id,
-            self.interaction.guild_id or 0,
-            self.interaction.user.display_name,
-            str(self.interaction.user.display_avatar),
-        )
+        user = self.interaction.user
+        guild_id = self.interaction.guild_id or 0
+        avatar = (user.display_name, str(user.display_avatar))
+        self.client.user_avatar_store.update_avatar(user.id, guild_id, *avatar)
+        self._avatars[(user.id, guild_id)] = avatar
 
-    def get_roll_record(self):
-        record = None
+    async def get_roll_record(self):
         if not self.interaction.message:
             return None
 
         message_id = self.interaction.message.id
-        record = self.client.message_store.get(message_id)
+        record = await self.client.message_store.get_async(message_id)
         if record:
             return record
 
@@ -60,10 +81,10 @@ class InteractionContext:
         if not original_id:
             return None
 
-        return self.get_cached_record(original_id)
+        return await self.get_cached_record(original_id)
 
-    def get_cached_record(self, message_id: int):
-        return self.client.message_store[message_id]
+    async def get_cached_record(self, message_id: int):
+        return await self.client.message_store.get_async(message_id)
 
     def cache_message_handle(self, handle: InteractionMessage):
         self.client.message_handles[handle.id] = handle
@@ -71,27 +92,101 @@ class InteractionContext:
     def get_cached_message_handle(self, id: int):
         return self.client.message_handles.get(id)
 
-    def get_avatar(self, user_id: int | None = None):
+    def get_avatar(self, user_id: int | None = None) -> tuple[str, str]:
+        """
+        A name and avatar from those load_header_data() fetched. Views are
+        built on the event loop, so a miss gets a placeholder, not a query.
+        """
         lookup_id = user_id if user_id else self.interaction.user.id
+        avatar = self._avatars.get((lookup_id, self.interaction.guild_id or 0))
+        if avatar is None:
+            log.debug("Avatar for %d wasn't prefetched", lookup_id)
+            return UNKNOWN_AVATAR
+        return avatar
+
+    async def load_header_data(self, result: RollRecordBase, owner_id: int):
+        """
+        Fetch the avatars a roll view needs ahead of building it, since the
+        views themselves are built synchronously.
+        """
+        user_ids = [owner_id or self.interaction.user.id]
+        if isinstance(result, ResistableRoll):
+            user_ids += result.already_resisted()
         guild_id = self.interaction.guild_id or 0
-        return self.client.user_avatar_store.get_avatar(lookup_id, guild_id)
+        store = self.client.user_avatar_store
+        for user_id in user_ids:
+            if (user_id, guild_id) not in self._avatars:
+                avatar = await store.get_avatar_async(user_id, guild_id)
+                self._avatars[(user_id, guild_id)] = avatar
+
+    def roll_header(self, label: str) -> tuple[str, str]:
+        """The owner's name over `label`, and their avatar, for a roll view."""
+        owner_id = self.owner_id
+        key = (owner_id, self.interaction.guild_id or 0, label)
+        header = self._headers.get(key)
+        if header is None:
+            (username, avatar) = self.get_avatar(owner_id)
+            header = (f"### {username}\n{label}", avatar)
+            self._headers[key] = header
+        return header
+
+    async def build_view(self, label: str, result: RollRecordBase, owner_id: int):
+        """
+        Build `owner_id`'s roll view in the richest layout that fits Discord's
+        text budget: die by die, then grouped faces, then the dice drawn into
+        an attached image, and the plain-text pack as a last resort.
+        Returns the view and any files it references.
+        """
+        # Roll views are only planned at this point, so trying the full layout
+        # and emoji pack first costs some string building but no ui components
+        self.owner_id = owner_id
+        await self.load_header_data(result, owner_id)
+        files: list[File] = []
+        view = result.build_view(label, self)
+        if view.content_length() > MAX_CONTENT_LENGTH:
+            self.compact_dice = True
+            view = result.build_view(label, self)
+        image_failed = False
+        if view.content_length() > MAX_CONTENT_LENGTH and isinstance(
+            view, BaseRollView
+        ):
+            self.compact_dice = False
+            self.emoji_manager = self.client.image_emojis
+            try:
+                view = result.build_view(label, self)
+                rows: list[str] = []
+                view.rewrite_text(lambda txt: extract_dice_rows(txt, rows))
+                if rows:
+                    png = await render_dice_rows_async(tuple(rows))
+                    files.append(File(BytesIO(png), filename=IMAGE_FILENAME))
+                    view.add_image(f"attachment://{IMAGE_FILENAME}")
+            except Exception:
+                log.exception("Rendering dice image failed, using the lite pack")
+                image_failed = True
+        if image_failed or view.content_length() > MAX_CONTENT_LENGTH:
+            files.clear()
+            self.compact_dice = True
+            self.emoji_manager = self.client.lite_emojis
+            view = result.build_view(label, self)
+        if isinstance(view, BaseRollView):
+            view.materialize()
+        return view, files
 
     async def update_original(
         self, old_record: MessageRecord, new_result: RollRecordBase
     ):
         await self.defer_if_needed()
-        view = new_result.build_view(old_record.label, self)
-        if view.content_length() > 4000:
-            self.emoji_manager = self.client.lite_emojis
-            view = new_result.build_view(old_record.label, self)
+        view, files = await self.build_view(
+            old_record.label, new_result, old_record.owner_id
+        )
         try:
             cached_message_handle = self.get_cached_message_handle(
                 old_record.message_id
             )
             if cached_message_handle:
-                await cached_message_handle.edit(view=view)
+                await cached_message_handle.edit(view=view, attachments=files)
                 new_record = replace(old_record, roll_result=new_result)
-                self.client.message_store.put(new_record)
+                await self.client.message_store.put_async(new_record)
                 log.info("Edited via cached message")
                 return new_record
             else:
@@ -108,9 +203,9 @@ class InteractionContext:
             original_message = self.interaction.channel.get_partial_message(
                 old_record.message_id
             )
-            await original_message.edit(view=view)
+            await original_message.edit(view=view, attachments=files)
             new_record = replace(old_record, roll_result=new_result)
-            self.client.message_store.put(new_record)
+            await self.client.message_store.put_async(new_record)
             log.info("Edited via partial message")
             return new_record
         except Exception as e:
@@ -126,14 +221,9 @@ class InteractionContext:
 
     async def transmit_result(self, label: str, result: RollRecordBase):
         interaction = self.interaction
-        primary_view = result.build_view(label, self)
-        if primary_view.content_length() > 4000:
-            self.emoji_manager = self.client.lite_emojis
-            primary_view = result.build_view(label, self)
+        primary_view, files = await self.build_view(label, result, interaction.user.id)
         send_message_response: InteractionCallbackResponse = (
-            await interaction.response.send_message(
-                view=primary_view,
-            )
+            await interaction.response.send_message(view=primary_view, files=files)
         )
         message_id = send_message_response.message_id
         if isinstance(send_message_response.resource, InteractionMessage):
@@ -169,7 +259,7 @@ class InteractionContext:
                 expires_at=int(expires_at.timestamp()),
                 roll_result=result,
             )
-            self.client.message_store.put(record)
+            await self.client.message_store.put_async(record)
             return record
 
     async def defer_if_needed(self):
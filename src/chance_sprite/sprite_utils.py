@@ -2,11 +2,10 @@
 from __future__ import annotations
 
 import logging
-import random
 from datetime import timedelta
 from enum import Enum
 import time
-from typing import Protocol, TypeGuard, runtime_checkable
+from typing import Protocol, Sequence, TypeGuard, runtime_checkable
 
 import discord
 
@@ -106,18 +105,103 @@ def color_by_net_hits(net: int):
     return accent
 
 
-def limit_mask(limit, rolls):
+def count_faces(rolls: Sequence[int]) -> tuple[int, ...]:
+    # Six buckets, index 0 is the number of 1s
+    return tuple(rolls.count(face) for face in range(1, 7))
+
+
+def add_face_counts(*counts: Sequence[int]) -> tuple[int, ...]:
+    return tuple(map(sum, zip(*counts)))
+
+
+def shift_face_counts(
+    counts: Sequence[int], rolls: Sequence[int], old_len: int, new_len: int
+) -> tuple[int, ...]:
+    # Face counts of rolls[:new_len] from those of rolls[:old_len], only counting the difference
+    if new_len >= old_len:
+        return add_face_counts(counts, count_faces(rolls[old_len:new_len]))
+    removed = count_faces(rolls[new_len:old_len])
+    return tuple(a - b for a, b in zip(counts, removed))
+
+
+# Limited dice are marked by moving their face up by this much, so one
+# str.translate table can render kept and limited dice in a single pass
+LIMITED_OFFSET = 8
+# The marks for each byte of a limit mask, die by die from the low bit
+_LIMITED_MARKS = tuple(
+    bytes(0 if byte >> i & 1 else LIMITED_OFFSET for i in range(8))
+    for byte in range(256)
+)
+_FACE_DIGITS = bytes.maketrans(bytes(range(1, 7)), b"123456")
+
+
+def mark_limited(rolls: Sequence[int], mask: int | None) -> bytes:
+    """Faces of `rolls` with every die outside the limit mask marked as limited."""
+    faces = bytes(rolls)
+    if mask is None or not faces:
+        return faces
+    n = len(faces)
+    mask_bytes = (mask & ((1 << n) - 1)).to_bytes((n + 7) // 8, "little")
+    marks = b"".join([_LIMITED_MARKS[byte] for byte in mask_bytes])[:n]
+    return (int.from_bytes(faces) + int.from_bytes(marks)).to_bytes(n)
+
+
+def render_faces(faces: bytes, table: Sequence[str]) -> str:
+    return faces.decode("latin-1").translate(table)
+
+
+def face_digits(rolls: Sequence[int]) -> str:
+    return bytes(rolls).translate(_FACE_DIGITS).decode()
+
+
+def compact_dice(rolls: Sequence[int], mask: int | None, table: Sequence[str]) -> str:
+    # Group identical faces, highest first (❻×7 ❺×4 ③), with limited dice after the rest
+    if mask is not None:
+        kept = [0] * 6
+        cut = [0] * 6
+        for i, x in enumerate(rolls):
+            (kept if mask >> i & 1 else cut)[x - 1] += 1
+    else:
+        kept = count_faces(rolls)
+        cut = (0,) * 6
+    parts = []
+    for counts, offset in ((kept, 0), (cut, LIMITED_OFFSET)):
+        for face in range(6, 0, -1):
+            n = counts[face - 1]
+            if n:
+                emoji = table[face + offset]
+                parts.append(emoji if n == 1 else f"{emoji}×{n}")
+    return " ".join(parts)
+
+
+# Die states while building a limit mask: kept, cut, or the cutoff face
+_KEPT, _CUT, _CUTOFF = b"1", b"0", b"c"
+
+
+def limit_mask(limit, rolls, counts: Sequence[int] | None = None) -> int | None:
+    """
+    Bitmask of the dice that count under the limit, bit i for die i, or None
+    if the limit doesn't cut anything.
+    """
     if limit <= 0 or limit >= len(rolls):
         return None
-    num_chosen = 0
-    mask = [False for _ in rolls]
-    for value in [6, 5, 4, 3, 2, 1]:
-        for i, el in enumerate(rolls):
-            if el == value:
-                mask[i] = True
-                num_chosen += 1
-                if num_chosen >= limit:
-                    return mask
+    if counts is None:
+        counts = count_faces(rolls)
+
+    # Find the lowest face that still fits under the limit, and how many of it fit
+    remaining = limit
+    cutoff = 6
+    for cutoff in range(6, 0, -1):
+        if counts[cutoff - 1] >= remaining:
+            break
+        remaining -= counts[cutoff - 1]
+
+    # One translate classifies every die, then the first `remaining` cutoff dice are kept
+    states = [_KEPT if f > cutoff else _CUTOFF if f == cutoff else _CUT for f in range(1, 7)]
+    table = bytes.maketrans(bytes(range(1, 7)), b"".join(states))
+    states = bytes(rolls).translate(table)
+    states = states.replace(_CUTOFF, _KEPT, remaining).replace(_CUTOFF, _CUT)
+    return int(states[::-1], 2)
 
 
 @runtime_checkable
@@ -135,8 +219,5 @@ class Glitch(Enum):
     CRITICAL = "critical"
 
 
-_default_random = random.Random()
-
-
 def epoch_seconds() -> int:
     return int(time.time())
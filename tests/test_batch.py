@@ -0,0 +1,59 @@
+from chance_sprite.message_cache import message_codec
+from chance_sprite.message_cache.roll_record_base import RollRecordBase
+from chance_sprite.packed_dice import PackedDice
+from chance_sprite.roll_types.basic import BatchRoll, BatchRollView, _fit_rows
+from chance_sprite.sprite_utils import color_by_net_hits
+
+from .test_smoke_generated import FakeContext
+
+
+def make_batch(threshold: int = 0, limit: int = 0) -> BatchRoll:
+    return BatchRoll(
+        dice=3,
+        count=4,
+        rolls=PackedDice((6, 5, 1, 2, 2, 3, 5, 5, 5, 6, 4, 1)),
+        threshold=threshold,
+        limit=limit,
+    )
+
+
+def test_batch_results_slice_the_packed_rolls():
+    results = make_batch().results
+    assert [tuple(r.rolls) for r in results] == [
+        (6, 5, 1),
+        (2, 2, 3),
+        (5, 5, 5),
+        (6, 4, 1),
+    ]
+    assert [r.hits_limited for r in results] == [2, 0, 3, 1]
+
+
+def test_batch_successes_at_threshold():
+    batch = make_batch(threshold=2)
+    assert batch.successes(batch.results) == 2
+    # Limited hits are what count against the threshold
+    limited = make_batch(threshold=2, limit=1)
+    assert limited.successes(limited.results) == 0
+    assert make_batch().successes(make_batch().results) == 0
+
+
+def test_batch_codec_round_trip():
+    message_codec.build_registry_default()
+    records = message_codec.union(RollRecordBase)
+    batch = make_batch(threshold=2, limit=3)
+    assert message_codec.decode(message_codec.encode(batch), records) == batch
+
+
+def test_batch_view_is_neutral_without_threshold():
+    view = BatchRollView(make_batch(), "Batch", FakeContext())
+    assert view.accent_color == color_by_net_hits(0)
+    view = BatchRollView(make_batch(threshold=4), "Batch", FakeContext())
+    assert view.accent_color == color_by_net_hits(-1)
+
+
+def test_fit_rows_drops_whole_rows():
+    rows = [f"row {i:02}" for i in range(10)]
+    assert _fit_rows(rows, 1000) == "\n".join(rows)
+    txt = _fit_rows(rows, 30)
+    assert len(txt) <= 30
+    assert txt == "row 00\nrow 01\nrow 02\n+7 more"
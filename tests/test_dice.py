@@ -0,0 +1,115 @@
+import random
+from collections import Counter
+
+import pytest
+
+from chance_sprite.dice_source import DiceSource
+from chance_sprite.packed_dice import PackedDice, ReplayDice, faces_from_bytes
+from chance_sprite.result_types import BreakTheLimitHitsResult, SecondChanceHitsResult
+from chance_sprite.roller import roll_exploding, roll_hits, second_chance
+from chance_sprite.sprite_utils import count_faces
+
+
+def test_faces_from_bytes_drops_biased_bytes():
+    raw = bytes(range(256))
+    faces = faces_from_bytes(raw)
+    assert len(faces) == 252
+    assert faces == bytes(b % 6 + 1 for b in range(252))
+
+
+def test_dice_source_faces_in_range_and_uniform():
+    rng = DiceSource(random.Random(1234))
+    faces = rng.roll_bytes(60000)
+    counts = Counter(faces)
+    assert set(counts) == {1, 2, 3, 4, 5, 6}
+    for face in range(1, 7):
+        assert abs(counts[face] - 10000) < 500
+
+
+def test_dice_source_refills_across_calls():
+    # A tiny chunk forces a refill partway through most pools
+    small = DiceSource(random.Random(99), chunk_size=8)
+    large = DiceSource(random.Random(99), chunk_size=8)
+    pools = [small.roll_bytes(n) for n in (3, 7, 1, 20, 0, 5)]
+    assert [len(p) for p in pools] == [3, 7, 1, 20, 0, 5]
+    # The same stream, whatever the pool boundaries
+    assert b"".join(pools) == large.roll_bytes(36)
+
+
+@pytest.mark.parametrize(
+    "faces", [(), (1,), (6, 1), (3, 5, 2), (1, 1, 1, 1, 1), tuple(range(1, 7)) * 11]
+)
+def test_packed_dice_round_trip(faces):
+    pool = PackedDice(faces)
+    encoded = pool.encode()
+    assert isinstance(encoded, bytes)
+    # Three bits a die, rounded up to whole bytes
+    assert len(encoded) <= (3 * len(faces) + 7) // 8
+    assert PackedDice.decode(encoded) == pool
+    assert tuple(PackedDice.decode(encoded)) == faces
+
+
+def test_packed_dice_decodes_legacy_lists():
+    assert PackedDice.decode([4, 6, 1]) == PackedDice((4, 6, 1))
+    assert PackedDice.decode([]) == PackedDice()
+
+
+def test_replay_dice_same_seed_same_faces():
+    assert tuple(ReplayDice(42, 30)) == tuple(ReplayDice(42, 30))
+    assert tuple(ReplayDice(42, 30)) != tuple(ReplayDice(43, 30))
+    assert all(1 <= face <= 6 for face in ReplayDice(42, 200))
+
+
+def test_replay_dice_extending_keeps_prefix():
+    pool = ReplayDice(7, 10)
+    faces = tuple(pool)
+    # Past the first replay chunk, so the stream has to be regenerated further
+    longer = DiceSource(replayable=True).extend(pool, 100)
+    assert isinstance(longer, ReplayDice)
+    assert len(longer) == 110
+    assert tuple(longer)[:10] == faces
+    assert PackedDice.decode(longer.encode()) == longer
+
+
+def check_counts(result):
+    # Every incrementally kept count must match counting the dice afresh
+    assert result.face_counts == count_faces(result.counted_rolls)
+    if isinstance(result, SecondChanceHitsResult):
+        assert result.reroll_face_counts == count_faces(result.counted_rerolls)
+        assert result.rerolled_hits == sum(r in (5, 6) for r in result.counted_rerolls)
+    if isinstance(result, BreakTheLimitHitsResult):
+        assert result.explosion_face_counts == result.count_explosions()
+
+
+@pytest.mark.parametrize("kind", ["hits", "second_chance", "exploding"])
+def test_adjust_dice_counts_match_recount(kind):
+    steps = random.Random(5)
+    rng = DiceSource(random.Random(6))
+    for _ in range(100):
+        dice = steps.randint(1, 20)
+        if kind == "exploding":
+            result = roll_exploding(dice, rng=rng)
+        else:
+            result = roll_hits(dice, rng=rng)
+            if kind == "second_chance":
+                result = second_chance(result, rng=rng)
+        check_counts(result)
+        # A random walk of grown and shrunk pools, sometimes down to nothing
+        for _ in range(30):
+            result = result.adjust_dice(steps.randint(-6, 6), rng=rng)
+            check_counts(result)
+
+
+@pytest.mark.parametrize("replayable", [False, True])
+def test_empty_roll_draws_nothing(replayable):
+    rng = DiceSource(random.Random(8), replayable=replayable)
+    fresh = DiceSource(random.Random(8), replayable=replayable)
+    assert rng.roll(0) == PackedDice()
+    assert rng.roll(-3) == PackedDice()
+    assert not isinstance(rng.roll(0), ReplayDice)
+    # The skipped rolls left the stream where it was
+    assert tuple(rng.roll(5)) == tuple(fresh.roll(5))
+    # An empty pool grows into an ordinary fresh roll
+    grown = rng.extend(rng.roll(0), 4)
+    assert len(grown) == 4
+    assert isinstance(grown, ReplayDice) == replayable
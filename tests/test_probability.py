@@ -0,0 +1,260 @@
+import random
+from collections import Counter
+from fractions import Fraction
+from itertools import product
+
+import pytest
+
+from chance_sprite.dice_source import DiceSource
+from chance_sprite.packed_dice import PackedDice
+from chance_sprite.probability.edge import push_the_limit_gain, second_chance_gain
+from chance_sprite.probability.exploding import exploding_odds
+from chance_sprite.probability.extended import extended_odds
+from chance_sprite.probability.hits import hits_odds
+from chance_sprite.probability.opposed import opposed_odds
+from chance_sprite.probability.simulation import (
+    SimulationResult,
+    simulate_alchemy_create,
+    simulate_binding,
+    simulate_spell,
+    simulate_summon,
+)
+from chance_sprite.result_types import HitsResult
+from chance_sprite.roller import roll_exploding
+from chance_sprite.rollui.base_menu_view import close_call_label
+from chance_sprite.sprite_utils import Glitch
+
+
+def enumerate_hits(dice: int, limit: int, gremlins: int):
+    """Brute-force the same numbers by walking every possible roll."""
+    total = 6**dice
+    hits = {}
+    glitch = critical = 0
+    for faces in product(range(1, 7), repeat=dice):
+        result = HitsResult(
+            original_dice=dice, rolls=PackedDice(faces), limit=limit, gremlins=gremlins
+        )
+        hits[result.hits_limited] = hits.get(result.hits_limited, 0) + 1
+        glitch += result.glitch != Glitch.NONE
+        critical += result.glitch == Glitch.CRITICAL
+    return (
+        {k: Fraction(v, total) for k, v in hits.items()},
+        Fraction(glitch, total),
+        Fraction(critical, total),
+    )
+
+
+@pytest.mark.parametrize(
+    "dice,limit,gremlins", [(1, 0, 0), (3, 2, 0), (4, 0, 1), (5, 3, 2)]
+)
+def test_hits_odds_matches_enumeration(dice, limit, gremlins):
+    odds = hits_odds(dice, limit, gremlins)
+    hits, glitch, critical = enumerate_hits(dice, limit, gremlins)
+    for k, p in enumerate(odds.hits):
+        assert p == pytest.approx(float(hits.get(k, 0)))
+    assert odds.glitch_chance == pytest.approx(float(glitch))
+    assert odds.critical_glitch_chance == pytest.approx(float(critical))
+
+
+@pytest.mark.parametrize("dice", [1, 6, 30])
+def test_exploding_odds_moments(dice):
+    odds = exploding_odds(dice)
+    # Each die scores 1/3 of a hit, plus 1/6 of a die's worth for every explosion
+    assert sum(odds.hits) == pytest.approx(1.0)
+    assert odds.expected_hits == pytest.approx(dice * 0.4)
+    assert sum(odds.explosions) == pytest.approx(1.0)
+    assert sum(e * p for e, p in enumerate(odds.explosions)) == pytest.approx(dice / 5)
+
+
+@pytest.mark.parametrize(("dice", "adjustment"), [(8, -3), (4, 3), (6, 0)])
+def test_exploding_odds_match_adjusted_rolls(dice, adjustment):
+    # Shrinking a pool drops dice that may already have exploded, so only the
+    # counted prefix of each layer should count
+    rng = DiceSource(random.Random(dice * 31 + adjustment))
+    trials = 20_000
+    glitches = criticals = 0
+    explosions = Counter()
+    for _ in range(trials):
+        result = roll_exploding(dice, rng=rng).adjust_dice(adjustment, rng=rng)
+        glitches += result.glitch != Glitch.NONE
+        criticals += result.glitch == Glitch.CRITICAL
+        explosions[sum(result.counted_explosions)] += 1
+
+    odds = exploding_odds(dice + adjustment)
+    assert glitches / trials == pytest.approx(odds.glitch_chance, abs=0.01)
+    assert criticals / trials == pytest.approx(odds.critical_glitch_chance, abs=0.01)
+    for e in range(4):
+        assert explosions[e] / trials == pytest.approx(odds.explosions[e], abs=0.015)
+
+
+def test_opposed_odds_even_pools():
+    odds = opposed_odds(7, 7)
+    assert odds.win_chance == pytest.approx(odds.loss_chance)
+    assert sum(odds.net_hits) == pytest.approx(1.0)
+    assert odds.net_chance(0) == pytest.approx(odds.tie_chance)
+    assert odds.expected_net_hits == pytest.approx(0.0)
+
+
+def enumerate_extended(dice: int, threshold: int, max_iters: int, limit: int):
+    """P(success) and P(intervals used == i), walking every roll of every interval."""
+    success = Fraction(0)
+    intervals: dict[int, Fraction] = {}
+
+    def walk(i: int, total: int, p: Fraction):
+        nonlocal success
+        hits, _, _ = enumerate_hits(dice - (i - 1), limit, 0)
+        for h, ph in hits.items():
+            q = p * ph
+            if total + h >= threshold:
+                success += q
+                intervals[i] = intervals.get(i, 0) + q
+            elif i == max_iters or dice - i < 1:
+                intervals[i] = intervals.get(i, 0) + q
+            else:
+                walk(i + 1, total + h, q)
+
+    walk(1, 0, Fraction(1))
+    return success, intervals
+
+
+@pytest.mark.parametrize(
+    "dice,threshold,max_iters,limit", [(3, 2, 3, 0), (4, 3, 2, 2), (2, 4, 5, 0)]
+)
+def test_extended_odds_matches_enumeration(dice, threshold, max_iters, limit):
+    odds = extended_odds(dice, threshold, max_iters, limit)
+    success, intervals = enumerate_extended(dice, threshold, max_iters, limit)
+    assert odds.success_chance == pytest.approx(float(success))
+    for i, p in enumerate(odds.intervals):
+        assert p == pytest.approx(float(intervals.get(i, 0)))
+    assert sum(odds.final_hits) == pytest.approx(1.0)
+
+
+def test_simulate_spell_agrees_with_opposed_odds():
+    result = simulate_spell(
+        force=4,
+        cast_dice=10,
+        drain_dice=8,
+        drain_code=-1,
+        opposing_pool=6,
+        trials=40_000,
+        seed=5,
+        use_numpy=False,
+    )
+    exact = opposed_odds(10, 6, initiator_limit=4)
+    assert result.success_chance == pytest.approx(exact.win_chance, abs=0.01)
+    mean_net = SimulationResult.mean(result.net_hits)
+    assert mean_net == pytest.approx(exact.expected_net_hits, abs=0.05)
+
+
+def test_simulate_summon_agrees_with_opposed_odds():
+    result = simulate_summon(
+        force=3, summon_dice=9, drain_dice=7, trials=40_000, seed=11, use_numpy=False
+    )
+    exact = opposed_odds(9, 3, initiator_limit=3)
+    assert result.success_chance == pytest.approx(exact.win_chance, abs=0.01)
+    services = sum(
+        max(i - exact.net_offset, 0) * p for i, p in enumerate(exact.net_hits)
+    )
+    assert SimulationResult.mean(result.services) == pytest.approx(services, abs=0.05)
+
+
+@pytest.mark.parametrize(
+    ("simulate", "args"),
+    [
+        (simulate_spell, dict(force=5, cast_dice=12, drain_dice=9, drain_code=-2)),
+        (
+            simulate_spell,
+            dict(force=4, cast_dice=8, drain_dice=6, drain_code=0, pre_edge=True),
+        ),
+        (simulate_summon, dict(force=4, summon_dice=10, drain_dice=8)),
+        (simulate_summon, dict(force=3, summon_dice=7, drain_dice=5, pre_edge=True)),
+        (
+            simulate_binding,
+            dict(force=3, bind_dice=9, drain_dice=7, services_in=2),
+        ),
+        (
+            simulate_alchemy_create,
+            dict(force=4, alchemy_dice=9, drain_code=-1, drain_dice=6),
+        ),
+    ],
+)
+def test_simulation_backends_agree(simulate, args):
+    pytest.importorskip("numpy")
+    fast = simulate(**args, trials=40_000, seed=3, use_numpy=True)
+    slow = simulate(**args, trials=40_000, seed=3, use_numpy=False)
+    assert fast.success_chance == pytest.approx(slow.success_chance, abs=0.015)
+    for dist in ("net_hits", "drain_taken", "services"):
+        fast_dist, slow_dist = getattr(fast, dist), getattr(slow, dist)
+        assert sum(fast_dist.values()) == pytest.approx(1.0)
+        assert SimulationResult.mean(fast_dist) == pytest.approx(
+            SimulationResult.mean(slow_dist), abs=0.08
+        )
+
+
+def test_numpy_simulation_agrees_with_opposed_odds():
+    pytest.importorskip("numpy")
+    result = simulate_spell(
+        force=4,
+        cast_dice=10,
+        drain_dice=8,
+        drain_code=-1,
+        opposing_pool=6,
+        trials=40_000,
+        seed=5,
+        use_numpy=True,
+    )
+    exact = opposed_odds(10, 6, initiator_limit=4)
+    assert result.success_chance == pytest.approx(exact.win_chance, abs=0.01)
+    mean_net = SimulationResult.mean(result.net_hits)
+    assert mean_net == pytest.approx(exact.expected_net_hits, abs=0.05)
+
+
+@pytest.mark.parametrize(
+    "dice_hits,rerolled,limit", [(0, 3, 0), (1, 2, 2), (2, 4, 3), (3, 1, 3)]
+)
+def test_second_chance_gain_matches_enumeration(dice_hits, rerolled, limit):
+    def limited(hits):
+        return min(hits, limit) if limit > 0 else hits
+
+    total = Fraction(0)
+    for faces in product(range(1, 7), repeat=rerolled):
+        new_hits = sum(1 for face in faces if face >= 5)
+        total += limited(dice_hits + new_hits) - limited(dice_hits)
+    expected = total / 6**rerolled
+    assert second_chance_gain(dice_hits, rerolled, limit) == pytest.approx(
+        float(expected)
+    )
+
+
+def enumerate_exploding_hits(dice: int, depth: int) -> Fraction:
+    """Expected hits from `dice` exploding dice, following sixes `depth` deep."""
+    if dice == 0 or depth == 0:
+        return Fraction(0)
+    total = Fraction(0)
+    for faces in product(range(1, 7), repeat=dice):
+        sixes = faces.count(6)
+        total += sum(1 for face in faces if face >= 5)
+        total += enumerate_exploding_hits(sixes, depth - 1)
+    return total / 6**dice
+
+
+@pytest.mark.parametrize("edge", [1, 2])
+def test_push_the_limit_gain_matches_enumeration(edge):
+    expected = enumerate_exploding_hits(edge, 6)
+    assert push_the_limit_gain(0, 0, edge) == pytest.approx(float(expected), abs=1e-4)
+    # Hits the limit was holding back come back on top
+    assert push_the_limit_gain(5, 3, edge) == pytest.approx(
+        2 + float(expected), abs=1e-4
+    )
+
+
+def test_close_call_label_follows_the_rolled_glitch():
+    def label(rolls):
+        pool = HitsResult(
+            original_dice=len(rolls), rolls=PackedDice(rolls), limit=0, gremlins=0
+        )
+        return close_call_label(pool.glitch)
+
+    assert label((1, 1, 1, 2)) == "🛡️ Crit→Glitch"
+    assert label((1, 1, 1, 5)) == "🛡️ -Glitch"
+    assert label((1, 2, 5, 6)) == "🛡️"
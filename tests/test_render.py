@@ -0,0 +1,131 @@
+import random
+from collections import Counter
+from types import SimpleNamespace
+
+import msgspec
+from msgspec.structs import replace
+
+from chance_sprite.emojis.dice_image import (
+    IMAGE_TOKEN_PACK,
+    extract_dice_rows,
+    render_dice_rows,
+)
+from chance_sprite.emojis.emoji_manager import RAW_TEXT_EMOJI_PACK, EmojiManager
+from chance_sprite.message_cache.message_codec import dec_hook, enc_hook
+from chance_sprite.packed_dice import PackedDice
+from chance_sprite.result_types import (
+    CloseCallResult,
+    HitsResult,
+    SecondChanceHitsResult,
+)
+from chance_sprite.sprite_utils import LIMITED_OFFSET, compact_dice
+
+EMOJI_NAMES = [
+    *(f"d6r{i}" for i in range(1, 7)),
+    *(f"d6l{i}" for i in range(1, 7)),
+    "d6e6",
+    "d6g1",
+    "d6l1g",
+    "reroll",
+]
+
+
+def round_trip(obj):
+    payload = msgspec.msgpack.encode(obj, enc_hook=enc_hook)
+    return payload, msgspec.msgpack.decode(payload, type=type(obj), dec_hook=dec_hook)
+
+
+def make_context(compact: bool = False):
+    manager = EmojiManager("chance_sprite.emojis")
+    manager.packs = RAW_TEXT_EMOJI_PACK
+    return SimpleNamespace(emoji_manager=manager, compact_dice=compact)
+
+
+def test_render_cache_keys_include_type_and_compact_flag():
+    context = make_context()
+    result = HitsResult(
+        original_dice=6, rolls=PackedDice((6, 6, 5, 3, 3, 2)), limit=2, gremlins=0
+    )
+    cache = context.emoji_manager.render_cache
+
+    full = result.render_dice(context)
+    result.promote(CloseCallResult).render_dice(context)
+    assert len(cache) == 2
+
+    context.compact_dice = True
+    compact = result.render_dice(context)
+    assert len(cache) == 3
+    assert compact != full
+
+    result.render_dice(context)
+    assert cache.hits == 1
+
+
+def test_build_packs_clears_render_cache():
+    context = make_context()
+    HitsResult(
+        original_dice=3, rolls=PackedDice((1, 2, 3)), limit=0, gremlins=0
+    ).render_dice(context)
+    manager = context.emoji_manager
+    assert len(manager.render_cache) == 1
+
+    manager.by_name = {name: f"<:{name}:1>" for name in EMOJI_NAMES}
+    manager.build_packs()
+    assert len(manager.render_cache) == 0
+
+
+def test_compact_dice_groups_faces():
+    table = RAW_TEXT_EMOJI_PACK.compiled.d6
+    rng = random.Random(3)
+    for _ in range(200):
+        rolls = [rng.randint(1, 6) for _ in range(rng.randint(1, 40))]
+        counts = Counter(rolls)
+        expected = " ".join(
+            table[face] if counts[face] == 1 else f"{table[face]}×{counts[face]}"
+            for face in range(6, 0, -1)
+            if counts[face]
+        )
+        assert compact_dice(rolls, None, table) == expected
+
+
+def test_compact_dice_puts_limited_groups_last():
+    table = RAW_TEXT_EMOJI_PACK.compiled.d6
+    rolls = [6, 5, 6, 5, 2]
+    # Keep the first two dice only
+    line = compact_dice(rolls, 0b00011, table)
+    kept = f"{table[6]} {table[5]}"
+    cut = " ".join(table[face + LIMITED_OFFSET] for face in (6, 5, 2))
+    assert line == f"{kept} {cut}"
+
+
+def test_extract_dice_rows_cuts_tokens_and_renders_png():
+    d6 = IMAGE_TOKEN_PACK.d6
+    txt = f"Roll {d6[0]}{d6[5]}{d6[3]} then {d6[1]}"
+    rows: list[str] = []
+    stripped = extract_dice_rows(txt, rows)
+    assert stripped == "Roll 🎲×3 then 🎲×1"
+    assert not any("\ue000" <= ch <= "\ue03f" for ch in stripped)
+    # Highest face first within a row
+    assert rows == [f"{d6[5]}{d6[3]}{d6[0]}", d6[1]]
+
+    png = render_dice_rows(tuple(rows))
+    assert png.startswith(b"\x89PNG\r\n\x1a\n")
+
+
+def test_dice_mask_is_cached_but_not_encoded():
+    result = SecondChanceHitsResult(
+        original_dice=4,
+        rolls=PackedDice((6, 5, 5, 1)),
+        limit=2,
+        gremlins=0,
+        rerolled_dice=PackedDice((6, 3)),
+        rerolled_hits=1,
+    )
+    mask = result.dice_mask
+    assert result.__dict__ == {"dice_mask": mask}
+    payload, decoded = round_trip(result)
+    assert b"dice_mask" not in payload
+    assert decoded == result
+    assert decoded.dice_mask == mask
+    # A changed limit is a new instance, so the mask is worked out again
+    assert replace(result, limit=0).dice_mask is None
@@ -17,6 +17,8 @@ from chance_sprite.emojis.emoji_manager import RAW_TEXT_EMOJI_PACK, EmojiManager
 
 # Import these from your real generator module
 from chance_sprite.fungen import Choices, Desc
+from chance_sprite.message_cache import message_codec
+from chance_sprite.message_cache.roll_record_base import RollRecordBase
 from chance_sprite.sprite_context import InteractionContext  # adjust names if different
 
 PACKAGE = "chance_sprite.roll_types"
@@ -236,6 +238,10 @@ class FakeContext(InteractionContext):
         self.base_command_name = None
         self.interaction = FakeInteraction()
         self.client = FakeClient()
+        self.compact_dice = False
+        self.owner_id = 0
+        self._avatars = {}
+        self._headers = {}
 
 
 @pytest.mark.asyncio
@@ -257,4 +263,10 @@ async def test_roll_smoke_per_item(case: Case) -> None:
     if hasattr(roll, "build_view"):
         context_obj = cast(object, FakeContext())
         context = cast(DiscordSprite, context_obj)
-        roll.build_view("Smoke", context)
+        view = roll.build_view("Smoke", context)
+        view.to_components()
+
+    if isinstance(roll, RollRecordBase):
+        message_codec.build_registry_default()
+        records = message_codec.union(RollRecordBase)
+        assert message_codec.decode(message_codec.encode(roll), records) == roll
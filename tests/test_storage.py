@@ -0,0 +1,397 @@
+import asyncio
+import threading
+
+import pytest
+
+from chance_sprite.file_sprite import (
+    DatabaseHandle,
+    MessageRecordStore,
+    UserAvatarStore,
+    WriteBehind,
+)
+from chance_sprite.message_cache import message_codec
+from chance_sprite.message_cache.message_record import MessageRecord
+from chance_sprite.message_cache.record_cache import RecordCache
+from chance_sprite.packed_dice import PackedDice
+from chance_sprite.roll_types.basic import BatchRoll
+from chance_sprite.sprite_context import UNKNOWN_AVATAR
+from chance_sprite.sprite_utils import epoch_seconds
+
+from .test_smoke_generated import FakeContext
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    monkeypatch.setattr(DatabaseHandle, "_state_dir", tmp_path)
+    database = DatabaseHandle("test.sqlite3")
+    # Tests flush by hand, so nothing is written behind their backs
+    database.writes.interval = 60
+    yield database
+    database.close()
+
+
+def make_record(message_id: int, expires_at: int | None = None) -> MessageRecord:
+    now = epoch_seconds()
+    return MessageRecord(
+        message_id=message_id,
+        guild_id=1,
+        channel_id=2,
+        owner_id=3,
+        label="test",
+        created_at=now,
+        expires_at=now + 3600 if expires_at is None else expires_at,
+        roll_result=BatchRoll(dice=2, count=2, rolls=PackedDice((6, 1, 5, 5))),
+    )
+
+
+@pytest.mark.asyncio
+async def test_call_async_runs_on_writer_thread(database):
+    name = await database.call_async(lambda: threading.current_thread().name)
+    assert name.startswith("sqlite-writer")
+    assert name != threading.current_thread().name
+
+
+@pytest.mark.asyncio
+async def test_put_async_then_get_async(database):
+    database.init_table_intkey("records")
+    await database.put_async("records", 1, b"first")
+    await database.put_async("records", 1, b"second")
+    assert await database.get_async("records", 1) == b"second"
+    assert await database.get_async("records", 2) is None
+    assert await database.count_async("records") == 1
+
+
+@pytest.mark.asyncio
+async def test_store_async_facade(database):
+    store = MessageRecordStore(database)
+    records = [make_record(i) for i in (3, 1, 2)]
+    for record in records:
+        await store.put_async(record)
+    assert await store.get_async(1) == records[1]
+    assert await store.get_async(4) is None
+    # Queued writes are flushed before counting
+    assert await store.count_async() == 3
+    assert await store.ids_async() == [1, 2, 3]
+
+    # With the cache dropped they come back from disk
+    store.cache.clear()
+    assert await store.get_async(2) == records[2]
+
+
+class AsyncOnlyAvatarStore:
+    def __init__(self, avatars):
+        self.avatars = avatars
+
+    def get_avatar(self, user_id, guild_id=0):
+        raise AssertionError("blocking lookup while building a view")
+
+    async def get_avatar_async(self, user_id, guild_id=0):
+        return self.avatars[user_id]
+
+
+@pytest.mark.asyncio
+async def test_get_avatar_only_reads_prefetched():
+    context = FakeContext()
+    context.client.user_avatar_store = AsyncOnlyAvatarStore({5: ("Five", "u5")})
+    assert context.get_avatar(5) == UNKNOWN_AVATAR
+
+    context.owner_id = 5
+    result = BatchRoll(dice=1, count=1, rolls=PackedDice((6,)))
+    await context.load_header_data(result, 5)
+    assert context.get_avatar(5) == ("Five", "u5")
+    assert context.roll_header("label") == ("### Five\nlabel", "u5")
+
+
+@pytest.mark.asyncio
+async def test_build_view_draws_the_owner_it_is_given():
+    context = FakeContext()
+    context.client.user_avatar_store = AsyncOnlyAvatarStore({5: ("Five", "u5")})
+    result = BatchRoll(dice=2, count=2, rolls=PackedDice((6, 1, 5, 5)))
+    # FakeClient's message_store is a plain dict, so a record lookup would fail
+    view, files = await context.build_view("label", result, 5)
+    assert view.header == ("### Five\nlabel\n**2** × `2d6`", "u5")
+    assert files == []
+
+
+@pytest.mark.asyncio
+async def test_write_behind_coalesces_writes_to_a_row(database):
+    writes = WriteBehind(database, interval=60)
+    written = []
+    for value in (1, 2, 3):
+        writes.put("row", value, lambda value=value: written.append(value))
+    writes.put("other", 4, lambda: written.append(4))
+    assert len(writes) == 2
+    assert writes.pending("row") == 3
+
+    await writes.flush()
+    assert written == [3, 4]
+    assert writes.pending("row") is None
+
+
+@pytest.mark.asyncio
+async def test_store_reads_its_own_writes(database):
+    store = MessageRecordStore(database)
+    record = make_record(1)
+    await store.put_async(record)
+    store.cache.clear()
+    # Still only queued, and served from the queue
+    assert await database.get_async("message_records", 1) is None
+    assert await store.get_async(1) == record
+
+    await database.writes.flush()
+    await store.delete_async(1)
+    assert await database.get_async("message_records", 1) is not None
+    assert await store.get_async(1) is None
+    assert store.get_optional(1) is None
+
+
+@pytest.mark.asyncio
+async def test_failed_write_only_drops_its_row(database, monkeypatch):
+    store = MessageRecordStore(database)
+    await store.put_async(make_record(1, expires_at=epoch_seconds() + 60))
+    await database.writes.flush()
+    put = database._put
+
+    def failing_put(table, record_id, *args):
+        if record_id == 1:
+            raise RuntimeError("disk on fire")
+        put(table, record_id, *args)
+
+    monkeypatch.setattr(database, "_put", failing_put)
+    stored = await store.get_async(1)
+    await store.put_async(make_record(1))
+    await store.put_async(make_record(2))
+    assert 1 in store.cache
+
+    await database.writes.flush()
+    # The bad row is dropped from the cache and reads fall back to disk
+    assert 1 not in store.cache
+    assert await store.get_async(1) == stored
+    assert await store.count_async() == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_write_keeps_newer_pending_value(database):
+    writes = WriteBehind(database, interval=60)
+    started, release = threading.Event(), threading.Event()
+    dropped = []
+
+    def failing_write():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("disk on fire")
+
+    writes.put("row", 1, failing_write, lambda: dropped.append(1))
+    flush = asyncio.create_task(writes.flush())
+    await asyncio.to_thread(started.wait, 5)
+    writes.put("row", 2, lambda: None, lambda: dropped.append(2))
+    release.set()
+    await flush
+
+    assert dropped == []
+    assert writes.pending("row") == 2
+
+
+@pytest.mark.asyncio
+async def test_failures_are_settled_per_batch_not_per_contents(database):
+    writes = WriteBehind(database, interval=60)
+    dropped = []
+
+    def failing_write():
+        raise RuntimeError("disk on fire")
+
+    def on_fail():
+        dropped.append("row")
+
+    # Two batches in flight at once, holding equal entries
+    writes.put("row", 1, failing_write, on_fail)
+    older = asyncio.create_task(writes.flush())
+    await asyncio.sleep(0)
+    writes.put("row", 1, failing_write, on_fail)
+    writes.flush_now()
+    # The newer batch settled first; nothing came after it, so its drop counts
+    assert dropped == ["row"]
+    await older
+    assert dropped == ["row", "row"]
+    assert writes._in_flight == []
+
+
+@pytest.mark.asyncio
+async def test_stored_guild_avatar_beats_pending_global(database):
+    avatars = UserAvatarStore(database)
+    avatars.update_avatar(7, 1, "Guild name", "guild.png")
+    await database.writes.flush()
+
+    avatars.update_avatar(7, 0, "Global name", "global.png")
+    assert await avatars.get_avatar_async(7, 1) == ("Guild name", "guild.png")
+    assert avatars.get_avatar(7, 1) == ("Guild name", "guild.png")
+    # Without a guild row the queued global one is used
+    assert await avatars.get_avatar_async(7, 2) == ("Global name", "global.png")
+    assert await avatars.get_avatar_async(7, 0) == ("Global name", "global.png")
+
+    avatars.update_avatar(7, 1, "New guild name", "guild2.png")
+    assert await avatars.get_avatar_async(7, 1) == ("New guild name", "guild2.png")
+
+
+@pytest.mark.asyncio
+async def test_expired_record_reads_as_missing(database):
+    store = MessageRecordStore(database)
+    await store.put_async(make_record(1, expires_at=epoch_seconds() - 1))
+    # Queued, cached and then on disk, it's a miss every time
+    assert await store.get_async(1) is None
+    assert store.get_optional(1) is None
+    await database.writes.flush()
+    store.cache.clear()
+    assert await store.get_async(1) is None
+    assert store.get_optional(1) is None
+    assert 1 not in store
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(("expired", "batches"), [(7, [3, 3, 1]), (6, [3, 3, 0])])
+async def test_sweep_deletes_in_batches(database, monkeypatch, expired, batches):
+    store = MessageRecordStore(database)
+    for record_id in range(expired):
+        await store.put_async(make_record(record_id, expires_at=epoch_seconds() - 1))
+    await database.writes.flush()
+
+    deleted_per_batch = []
+    delete_expired = store._delete_expired
+
+    def spy(now, limit):
+        assert limit == 3
+        deleted, freed = delete_expired(now, limit)
+        deleted_per_batch.append(deleted)
+        return deleted, freed
+
+    monkeypatch.setattr(store, "_delete_expired", spy)
+    assert await store.sweep_expired(batch_size=3, pause=0) == expired
+    assert deleted_per_batch == batches
+    assert store.rows_swept == expired
+    assert await store.count_async() == 0
+
+
+@pytest.mark.asyncio
+async def test_sweep_keeps_live_and_pending_records(database):
+    store = MessageRecordStore(database)
+    expired = epoch_seconds() - 1
+    await store.put_async(make_record(1))
+    await store.put_async(make_record(2, expires_at=expired))
+    await store.put_async(make_record(3, expires_at=expired))
+    await database.writes.flush()
+
+    # Renewed and brand new records still waiting in the queue
+    renewed = make_record(3)
+    await store.put_async(renewed)
+    await store.put_async(make_record(4))
+
+    assert await store.sweep_expired(pause=0) == 2
+    assert await store.get_async(1) is not None
+    assert await store.get_async(2) is None
+    assert await store.get_async(3) == renewed
+    assert await store.ids_async() == [1, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_record_cache_write_through_and_discard(database):
+    store = MessageRecordStore(database)
+    record = make_record(1)
+    await store.put_async(record)
+    assert store.cache.peek(1) is record
+    assert store.cache.size > 0
+
+    assert await store.get_async(1) is record
+    assert store.cache.hits == 1
+
+    await store.delete_async(1)
+    assert 1 not in store.cache
+    assert store.cache.size == 0
+
+
+def test_record_cache_evicts_least_recent_by_bytes():
+    cache = RecordCache[str](max_bytes=100)
+    cache.put(1, "a", 40)
+    cache.put(2, "b", 40)
+    assert cache.get(1) == "a"
+    # 2 is now the least recent, and going over the budget evicts it
+    cache.put(3, "c", 30)
+    assert list(cache._records) == [1, 3]
+    assert cache.size == 70
+
+    # Evicting as many old entries as it takes to fit a big one
+    cache.put(4, "d", 90)
+    assert list(cache._records) == [4]
+    assert cache.size == 90
+    # Too big to cache at all, and it doesn't push anything out
+    cache.put(5, "e", 101)
+    assert 5 not in cache and 4 in cache
+
+    # Replacing an entry swaps its size
+    cache.put(4, "d", 10)
+    assert cache.size == 10
+    assert cache.get(6) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def make_legacy_table(database, record_ids):
+    # The table as it was before the queryable columns were added
+    database.execute(
+        "CREATE TABLE message_records"
+        "(record_id INTEGER PRIMARY KEY, payload BLOB NOT NULL)"
+    )
+    for record_id in record_ids:
+        payload = message_codec.encode(make_record(record_id))
+        database.execute(
+            "INSERT INTO message_records VALUES (?, ?)", (record_id, payload)
+        )
+
+
+@pytest.mark.asyncio
+async def test_backfill_fills_legacy_rows(database, monkeypatch):
+    make_legacy_table(database, range(1, 6))
+    database.execute("INSERT INTO message_records VALUES (6, x'c1')")
+    store = MessageRecordStore(database)
+
+    assert await store.backfill_columns(chunk_size=2, pause=0) == 5
+    rows = database.execute(
+        "SELECT record_id, guild_id, owner_id, roll_type FROM message_records "
+        "ORDER BY record_id"
+    )
+    assert rows[:5] == [(i, 1, 3, "BatchRoll") for i in range(1, 6)]
+    # The undecodable row is marked, not fatal
+    assert rows[5] == (6, None, None, "!undecodable")
+
+    # Nothing is left to fill the second time round, nor read at all
+    decoded = []
+    monkeypatch.setattr(store, "_decode", lambda *args: decoded.append(args))
+    assert await store.backfill_columns(chunk_size=2, pause=0) == 0
+    assert decoded == []
+
+    # Only the rows still missing a column are read
+    database.execute("UPDATE message_records SET owner_id = NULL WHERE record_id = 4")
+    assert await store.backfill_columns(chunk_size=2, pause=0) == 0
+    assert [record_id for record_id, _ in decoded] == [4]
+
+
+@pytest.mark.asyncio
+async def test_backfill_rolls_back_a_failed_chunk(database):
+    make_legacy_table(database, range(1, 5))
+    store = MessageRecordStore(database)
+    database.execute(
+        "CREATE TRIGGER refuse BEFORE UPDATE ON message_records "
+        "WHEN NEW.record_id = 4 BEGIN SELECT RAISE(ABORT, 'refused'); END"
+    )
+
+    with pytest.raises(Exception, match="refused"):
+        await store.backfill_columns(chunk_size=2, pause=0)
+    assert not await database.call_async(lambda: database.conn.in_transaction)
+    # The first chunk stays committed, the failed one is undone entirely
+    rows = database.execute(
+        "SELECT record_id, guild_id FROM message_records ORDER BY record_id"
+    )
+    assert rows == [(1, 1), (2, 1), (3, None), (4, None)]
+
+    # And the connection is still fit for writing
+    await store.put_async(make_record(5))
+    await database.writes.flush()
+    assert await store.count_async() == 5